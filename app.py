@@ -2,14 +2,18 @@
 # Music Teacher Observation Assistant - Modular Version with Solo Teaching
 # Created by Brett Taylor
 
+import queue
 import streamlit as st
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 # Import configuration and setup
 import config
-from ui.components import (
-    inject_custom_css,
+import prompts
+from ui.styling import inject_custom_css
+from ui.solo_components import render_solo_interface
+from ui.observation_components import (
     render_header,
-    render_solo_interface,
     render_observation_header,
     render_name_inputs,
     render_audio_uploads,
@@ -17,22 +21,11 @@ from ui.components import (
     render_downloads,
     render_footer,
 )
-from core.transcription import (
-    transcribe_audio,
-    align_transcriptions,
-)
-from core.reports import (
-    analyze_lesson_context,
-    research_best_practices,
-    generate_observation_report,
-)
+
+InputCheck = namedtuple("InputCheck", "is_valid error_message input_summary total_steps has_notes")
 
 # --- Page Setup ------------------------------------------------------------
-st.set_page_config(
-    page_title="Music Teacher Observation Assistant",
-    page_icon="🎵",
-    layout="wide",
-)
+st.set_page_config(**config.PAGE_CONFIG)
 
 # Initialize session state
 config.initialize_session_state()
@@ -63,6 +56,7 @@ with tab2:
     report_length = "Standard"
     include_transcript = True
     report_sections = ["Summary", "Strengths", "Areas for Growth"]
+    celebrate = config.CELEBRATE  # Balloons on completion; BOT3_CELEBRATE=0 turns them off
 
     # Name inputs
     render_name_inputs()
@@ -70,21 +64,40 @@ with tab2:
     # Audio uploads
     teacher_file, observer_file = render_audio_uploads()
 
+    # Connect to Gemini in the background once there is audio to send, while
+    # the rest of the form is filled in; plain page loads make no API call
+    if teacher_file is not None or observer_file is not None:
+        config.warm_up_client()
+
     # Text inputs
     observer_notes, evaluation_criteria = render_text_inputs()
 
     # --- Input Validation ------------------------------------------------------
-    def validate_inputs(teacher_file, observer_file, observer_notes):
+    def analyze_inputs(teacher_file, observer_file, observer_notes):
         """
-        Validate that at least one input source is provided.
-        Returns (is_valid, error_message, input_summary)
+        Validate that at least one input source is provided and count the
+        processing steps, checking the notes only once.
+        Returns InputCheck(is_valid, error_message, input_summary, total_steps, has_notes)
         """
         has_teacher = teacher_file is not None
         has_observer_audio = observer_file is not None
-        has_observer_notes = observer_notes and observer_notes.strip()
+        has_notes = bool(observer_notes and observer_notes.strip())
+        
+        if not (has_teacher or has_observer_audio or has_notes):
+            return InputCheck(False, "Please provide at least one input: teacher audio, observer audio, or observer notes.", None, 0, False)
         
-        if not any([has_teacher, has_observer_audio, has_observer_notes]):
-            return False, "Please provide at least one input: teacher audio, observer audio, or observer notes.", None
+        # Fail fast on uploads the API would reject, before anything is sent
+        for label, audio_file in (("Teacher", teacher_file), ("Observer", observer_file)):
+            if audio_file is None:
+                continue
+            if audio_file.size == 0:
+                return InputCheck(False, f"{label} audio file is empty.", None, 0, False)
+            if audio_file.size > config.MAX_AUDIO_UPLOAD_MB * 1024 * 1024:
+                return InputCheck(False, f"{label} audio file is larger than {config.MAX_AUDIO_UPLOAD_MB} MB.", None, 0, False)
+            if audio_file.type and not (
+                audio_file.type.startswith("audio/") or audio_file.type in config.ACCEPTED_VIDEO_CONTAINERS
+            ):
+                return InputCheck(False, f"{label} file does not look like audio ({audio_file.type}).", None, 0, False)
         
         # Build input summary
         inputs = []
@@ -92,265 +105,242 @@ with tab2:
             inputs.append("teacher classroom audio")
         if has_observer_audio:
             inputs.append("observer audio commentary")
-        if has_observer_notes:
+        if has_notes:
             inputs.append("written observer notes")
         
-        input_summary = ", ".join(inputs)
+        # Always research + report, one per audio file, and alignment only
+        # when there is both teacher audio and observer content. An estimate
+        # until the transcripts are in; the pipeline recounts the later steps
+        total_steps = 2 + has_teacher + has_observer_audio + (has_teacher and (has_observer_audio or has_notes))
         
-        return True, "", input_summary
-
-    def calculate_processing_steps(teacher_file, observer_file, observer_notes):
-        """
-        Calculate total processing steps based on available inputs.
-        Returns total_steps count.
-        """
-        steps = 2  # Always: Research + Report Generation
-        
-        if teacher_file:
-            steps += 1  # Teacher transcription
-        
-        if observer_file:
-            steps += 1  # Observer transcription
-        
-        # Alignment step only if we have both teacher and observer content
-        has_observer_content = observer_file or (observer_notes and observer_notes.strip())
-        if teacher_file and has_observer_content:
-            steps += 1  # Alignment
-        
-        return steps
+        return InputCheck(True, "", ", ".join(inputs), total_steps, has_notes)
 
     # --- Processing Button ----------------------------------------------------
     st.markdown("---")
 
     # Validate inputs before showing button
-    is_valid, validation_error, input_summary = validate_inputs(teacher_file, observer_file, observer_notes)
+    inputs = analyze_inputs(teacher_file, observer_file, observer_notes)
+    input_summary = inputs.input_summary
 
-    if is_valid:
+    if inputs.is_valid:
         if st.button("🎯 Generate Observation Report", use_container_width=True):
             
-            # Calculate total steps
-            total_steps = calculate_processing_steps(teacher_file, observer_file, observer_notes)
-            current_step = 0
+            # Pipeline modules (and google-genai) load on first use, not on page load
+            from core.transcription import transcribe_audio, hash_audio, get_cached_transcription, align_transcriptions, timestamps_overlap
+            from core.utils import clean_transcription, remove_timestamps
+            from core.analysis import analyze_and_research, generate_observation_report_stream
+            
+            # One status log + progress bar; independent steps report as they finish
+            total_steps = inputs.total_steps
+            completed_steps = 0
+            status = st.status("🔄 Generating observation report...", expanded=True)
+            progress_bar = st.progress(0)
+
+            # Fraction of each long recording's chunks already transcribed,
+            # so the bar moves while a step is still running
+            partial_steps = {}
+
+            def update_progress():
+                """Redraw the progress bar from finished and partly finished steps"""
+                progress_bar.progress(min(1.0, (completed_steps + sum(partial_steps.values())) / total_steps))
+
+            def complete_step(message):
+                """Log a finished step and advance the progress bar"""
+                global completed_steps
+                completed_steps += 1
+                status.write(message)
+                update_progress()
+
+            def fail_pipeline(*messages):
+                """Mark the run as failed, show the errors, and stop the script"""
+                status.update(label="❌ Observation report failed", state="error")
+                for message in messages:
+                    st.error(message)
+                st.stop()
             
             # Setup client/config
             client = config.create_client()
             generation_cfg, transcription_cfg = config.get_generation_configs()
 
-            # STEP 1: Transcribe Teacher Audio (if provided)
-            if teacher_file:
-                current_step += 1
-                with st.spinner(f"🔄 Step {current_step}/{total_steps}: Transcribing teacher audio..."):
-                    try:
-                        st.session_state.teacher_transcription = transcribe_audio(
-                            teacher_file, is_teacher=True, client=client, config=transcription_cfg
-                        )
-                        st.success("✅ Teacher audio transcribed!")
-                    except Exception as e:
-                        st.error(f"❌ Teacher transcription failed: {str(e)}")
-                        st.error("Please verify the audio file is not corrupted and try again.")
-                        st.stop()
-            else:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # STEP 1: Transcribe Teacher and Observer Audio in parallel (if provided)
                 st.session_state.teacher_transcription = None
-
-            # STEP 2: Transcribe Observer Audio (if provided)
-            observer_content = ""
-            if observer_file:
-                current_step += 1
-                with st.spinner(f"🔄 Step {current_step}/{total_steps}: Transcribing observer audio..."):
-                    try:
-                        st.session_state.observer_transcription = transcribe_audio(
-                            observer_file, is_teacher=False, client=client, config=transcription_cfg
-                        )
-                        observer_content = st.session_state.observer_transcription
-                        st.success("✅ Observer audio transcribed!")
-                    except Exception as e:
-                        st.error(f"❌ Observer transcription failed: {str(e)}")
-                        st.stop()
-            
-            # Combine observer notes if provided
-            if observer_notes and observer_notes.strip():
-                observer_content += f"\n\nOBSERVER WRITTEN NOTES:\n{observer_notes}"
-                st.success("✅ Observer notes included!")
-
-            # STEP 3: Align Transcriptions (only if we have both teacher and observer content)
-            if st.session_state.teacher_transcription and observer_content:
-                current_step += 1
-                with st.spinner(f"🔄 Step {current_step}/{total_steps}: Aligning observations chronologically..."):
-                    try:
-                        st.session_state.aligned_teacher, st.session_state.aligned_observer = align_transcriptions(
-                            st.session_state.teacher_transcription,
-                            observer_content,
-                            client,
-                            generation_cfg
-                        )
-                        st.success("✅ Observations aligned chronologically!")
-                    except Exception as e:
-                        # Fallback: just remove timestamps
-                        import re
-                        st.session_state.aligned_teacher = re.sub(r'\[\d{2}:\d{2}\]\s*', '', st.session_state.teacher_transcription or "")
-                        st.session_state.aligned_observer = re.sub(r'\[\d{2}:\d{2}\]\s*', '', observer_content or "")
-                        st.success("✅ Observations aligned chronologically!")
-            else:
-                # Only one source - just clean timestamps
-                import re
-                if st.session_state.teacher_transcription:
-                    st.session_state.aligned_teacher = re.sub(r'\[\d{2}:\d{2}\]\s*', '', st.session_state.teacher_transcription)
-                else:
-                    st.session_state.aligned_teacher = ""
+                observer_transcription = None
+                transcription_futures = {}
+                # Chunk callbacks run on worker threads, which cannot touch the
+                # page; they queue (source, done, total) for the script thread
+                chunk_updates = queue.Queue()
+                # Each upload is read once here; workers get bytes, not the file handle
+                for source, audio_file, is_teacher in (
+                    ("teacher", teacher_file, True),
+                    ("observer", observer_file, False),
+                ):
+                    if not audio_file:
+                        continue
+                    audio_bytes = audio_file.getvalue()
+                    file_extension = audio_file.name.split('.')[-1]
+                    audio_digest = hash_audio(audio_bytes)
+                    cached = get_cached_transcription(audio_bytes, file_extension, is_teacher, transcription_cfg, audio_digest)
+                    if cached is not None:
+                        if is_teacher:
+                            st.session_state.teacher_transcription = cached
+                        else:
+                            st.session_state.observer_transcription = cached
+                            observer_transcription = cached
+                        complete_step(f"⚡ {source.capitalize()} transcription loaded from cache")
+                        continue
+                    transcription_futures[executor.submit(
+                        transcribe_audio, audio_bytes, is_teacher, client, transcription_cfg,
+                        file_extension=file_extension, audio_digest=audio_digest,
+                        on_chunk_done=lambda done, total, source=source: chunk_updates.put((source, done, total)),
+                    )] = source
+                if transcription_futures:
+                    status.update(label="🔄 Transcribing audio...")
+
+                def report_chunk_progress():
+                    """Log chunks finished since the last check and nudge the progress bar"""
+                    while not chunk_updates.empty():
+                        source, done, total = chunk_updates.get_nowait()
+                        status.write(f"🔹 {source.capitalize()} audio: part {done} of {total} transcribed")
+                        partial_steps[source] = done / total
+                    update_progress()
+
+                # Session state is only written here, on the script thread
+                pending = set(transcription_futures)
+                while pending:
+                    finished, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    report_chunk_progress()
+                    for future in finished:
+                        source = transcription_futures[future]
+                        partial_steps.pop(source, None)
+                        try:
+                            transcription = future.result()
+                        except Exception as e:
+                            if source == "teacher":
+                                fail_pipeline(
+                                    f"❌ Teacher transcription failed: {str(e)}",
+                                    "Please verify the audio file is not corrupted and try again.",
+                                )
+                            else:
+                                fail_pipeline(f"❌ Observer transcription failed: {str(e)}")
+                        if source == "teacher":
+                            st.session_state.teacher_transcription = transcription
+                            complete_step("✅ Teacher audio transcribed!")
+                        else:
+                            st.session_state.observer_transcription = transcription
+                            observer_transcription = transcription
+                            complete_step("✅ Observer audio transcribed!")
                 
-                if observer_content:
-                    st.session_state.aligned_observer = re.sub(r'\[\d{2}:\d{2}\]\s*', '', observer_content)
+                # Combine observer transcription and notes in a single join
+                observer_content = "\n\n".join(
+                    part for part in (
+                        observer_transcription,
+                        f"OBSERVER WRITTEN NOTES:\n{observer_notes}" if inputs.has_notes else None,
+                    ) if part
+                )
+                if inputs.has_notes:
+                    status.write("✅ Observer notes included!")
+
+                # STEP 2: Align Transcriptions + Research Best Practices (concurrently)
+                # Timestamp-free text is all the analysis needs, so it does not wait for alignment.
+                # Cleaned the same way as align_transcriptions' fallback, since it is also the
+                # final text whenever alignment is skipped
+                st.session_state.aligned_teacher = remove_timestamps(clean_transcription(st.session_state.teacher_transcription))
+                st.session_state.aligned_observer = remove_timestamps(clean_transcription(observer_content))
+                analysis_context = prompts.get_transcript_context(
+                    st.session_state.aligned_teacher,
+                    st.session_state.aligned_observer
+                )
+                needs_alignment = bool(st.session_state.teacher_transcription and observer_content)
+                if needs_alignment and not timestamps_overlap(st.session_state.teacher_transcription, observer_content):
+                    # Untimed notes or non-overlapping recordings: the timestamp-free text is already the result
+                    needs_alignment = False
+                    status.write("⏭️ Alignment skipped (no overlapping timestamps to interleave)")
+                # Recount from what will actually run: alignment can be skipped above
+                # or by an empty transcript, so the bar still ends at 100%
+                total_steps = completed_steps + needs_alignment + 2  # + research + report
+                update_progress()
+                has_content = bool(st.session_state.aligned_teacher or st.session_state.aligned_observer)
+
+                status.update(label="🔄 Aligning observations and researching best practices..." if needs_alignment else "🔄 Researching music education best practices...")
+                step_futures = {}
+                if needs_alignment:
+                    step_futures[executor.submit(
+                        align_transcriptions,
+                        st.session_state.teacher_transcription,
+                        observer_content,
+                        client,
+                        generation_cfg
+                    )] = "align"
+                if has_content:
+                    # Deliberately the pre-alignment text: feeding aligned_* here would make research wait for alignment again
+                    step_futures[executor.submit(
+                        analyze_and_research,
+                        analysis_context,
+                        client,
+                        generation_cfg
+                    )] = "research"
                 else:
-                    st.session_state.aligned_observer = ""
-
-            # STEP 4: Research Best Practices
-            current_step += 1
-            with st.spinner(f"🔄 Step {current_step}/{total_steps}: Researching music education best practices..."):
-                try:
-                    # Use whichever transcription is available for analysis
-                    analysis_text = st.session_state.aligned_teacher if st.session_state.aligned_teacher else st.session_state.aligned_observer
-                    
-                    if analysis_text:
-                        lesson_analysis = analyze_lesson_context(
-                            transcription=analysis_text,
-                            client=client,
-                            config=generation_cfg
-                        )
-                        st.session_state.lesson_analysis = lesson_analysis
-                        
-                        best_practices = research_best_practices(
-                            lesson_analysis,
-                            client=client,
-                            config=generation_cfg
-                        )
-                        st.success("✅ Best practices research completed!")
-                    else:
-                        best_practices = "Using general music education principles."
-                        st.session_state.lesson_analysis = "General music education context"
-                        st.success("✅ Using general music education principles!")
-                        
-                except Exception as e:
-                    st.warning(f"⚠️ Research step encountered an issue. Proceeding with analysis: {str(e)}")
                     best_practices = "Using general music education principles."
                     st.session_state.lesson_analysis = "General music education context"
-
-            # STEP 5: Generate Observation Report
-            current_step += 1
-            with st.spinner(f"🔄 Step {current_step}/{total_steps}: Generating comprehensive observation report..."):
-                try:
-                    # Build scope instruction
-                    scope_instruction = ""
-                    if st.session_state.aligned_teacher and st.session_state.aligned_observer:
-                        scope_instruction = """
-SCOPE: Full classroom analysis with both teacher audio and observer notes available.
-- Use teacher audio quotes as evidence
-- Prioritize observer observations and find supporting evidence in teacher audio
-- Provide comprehensive feedback"""
-                    elif st.session_state.aligned_teacher:
-                        scope_instruction = """
-SCOPE: Analysis based on teacher classroom audio only (no observer notes).
-- Use teacher audio quotes as evidence
-- Base evaluation on best practices research
-- Provide objective analysis of observed teaching practices"""
+                    complete_step("✅ Using general music education principles!")
+
+                for future in as_completed(step_futures):
+                    if step_futures[future] == "align":
+                        try:
+                            st.session_state.aligned_teacher, st.session_state.aligned_observer = future.result()
+                        except Exception:
+                            # Fallback: keep the timestamp-free text
+                            pass
+                        complete_step("✅ Observations aligned chronologically!")
                     else:
-                        scope_instruction = """
-SCOPE: Analysis based ONLY on observer notes/audio (no teacher classroom audio).
-- Focus on documented observer observations
-- Acknowledge limited scope - no direct classroom audio evidence available
-- Include disclaimer noting report is based on observer perspective only
-- Do NOT quote observer audio - paraphrase their observations instead"""
-                    
-                    criteria_text = ""
-                    if evaluation_criteria:
-                        criteria_text = f"\n\nEVALUATION CRITERIA PROVIDED:\n{evaluation_criteria}"
-                    
-                    sections_text = ", ".join(report_sections)
-                    
-                    length_instruction = {
-                        "Brief": "Keep the report concise (1-2 paragraphs per section).",
-                        "Standard": "Provide a thorough analysis with appropriate detail (2-3 paragraphs per section).",
-                        "Comprehensive": "Provide an extensive, detailed analysis with multiple examples (3-4+ paragraphs per section).",
-                    }
-                    
-                    report_prompt = f"""GENERATE MUSIC TEACHER OBSERVATION REPORT
-
-CRITICAL FORMATTING INSTRUCTIONS - READ CAREFULLY:
-1. DO NOT USE MARKDOWN. Do not use asterisks (**) for bold or italics.
-2. Use these exact section headers in ALL CAPS with no formatting: LESSON SUMMARY:, STRENGTHS:, AREAS FOR GROWTH:
-3. For each item under STRENGTHS and AREAS FOR GROWTH, provide a short descriptive title on its own line (3-7 words, no special formatting, no brackets, no asterisks)
-4. Follow each title with explanatory paragraphs in plain text
-5. Never use brackets [ ] or asterisks ** in your output
-6. Use plain text only - the PDF formatting will be applied automatically
-7. Use quotations ONLY from teacher audio as evidence (if available)
-8. Be generous with praise but clear with constructive criticism
-9. Maintain professional, neutral language throughout
-10. Do NOT include any 'Note:' or 'Disclaimer:' lines in your output. The application adds a single disclaimer in the PDF footer.
-
-OUTPUT FORMAT EXAMPLE (follow this exact style):
-LESSON SUMMARY:
-[Your paragraph here in plain text]
-
-STRENGTHS:
-Positive Classroom Environment
-[Paragraph explaining this strength]
-
-Effective Use of Feedback
-[Paragraph explaining this strength]
-
-AREAS FOR GROWTH:
-Differentiation Strategies
-[Paragraph with constructive feedback]
-
-Time Management
-[Paragraph with constructive feedback]
-
-{scope_instruction}
-{criteria_text}
-
-SECTION REQUIREMENTS:
-Include these sections: {sections_text}
-{length_instruction[report_length]}
-
-AVAILABLE DATA:
-- Teacher Audio: {'YES' if st.session_state.aligned_teacher else 'NO'}
-- Observer Audio/Notes: {'YES' if st.session_state.aligned_observer else 'NO'}
-- Input Summary: {input_summary}
-
-LESSON ANALYSIS:
-{st.session_state.lesson_analysis}
-
-BEST PRACTICES RESEARCH:
-{best_practices}
-
-TEACHER AUDIO TRANSCRIPTION:
-{st.session_state.aligned_teacher if st.session_state.aligned_teacher else "Not available - no teacher audio provided."}
-
-OBSERVER OBSERVATIONS:
-{st.session_state.aligned_observer if st.session_state.aligned_observer else "No observer notes provided."}
-
-REMEMBER: Output plain text only. No markdown. No asterisks. No brackets. The formatting will be applied during PDF generation. Do NOT include any 'Note:' or 'Disclaimer:' text."""
-                    
-                    response = client.models.generate_content(
-                        model="gemini-flash-latest",
-                        contents=[{"role": "user", "parts": [{"text": report_prompt}]}],
-                        config=generation_cfg,
-                    )
-                    
-                    st.session_state.observation_report = response.text
-                    st.success("✅ Observation report generated!")
-                    
-                except Exception as e:
-                    st.error(f"❌ Report generation failed: {str(e)}")
-                    st.stop()
+                        try:
+                            lesson_analysis, best_practices = future.result()
+                            st.session_state.lesson_analysis = lesson_analysis
+                            complete_step("✅ Best practices research completed!")
+                        except Exception as e:
+                            status.write(f"⚠️ Research step encountered an issue. Proceeding with analysis: {str(e)}")
+                            best_practices = "Using general music education principles."
+                            st.session_state.lesson_analysis = "General music education context"
+                            complete_step("✅ Using general music education principles!")
+
+            # STEP 3: Generate Observation Report (streamed into the page as it arrives)
+            status.update(label="🔄 Generating comprehensive observation report...")
+            try:
+                report_placeholder = st.empty()
+                report_chunks = []
+                for text in generate_observation_report_stream(
+                    lesson_analysis=st.session_state.lesson_analysis,
+                    best_practices=best_practices,
+                    aligned_teacher=st.session_state.aligned_teacher,
+                    aligned_observer=st.session_state.aligned_observer,
+                    evaluation_criteria=evaluation_criteria,
+                    report_sections=report_sections,
+                    report_length=report_length,
+                    client=client,
+                    config=generation_cfg,
+                    input_summary=input_summary,
+                ):
+                    report_chunks.append(text)
+                    report_placeholder.markdown("".join(report_chunks))
+                
+                st.session_state.observation_report = "".join(report_chunks)
+                report_placeholder.empty()
+                complete_step("✅ Observation report generated!")
+                status.update(label="✅ Observation report ready", state="complete", expanded=False)
+                
+            except Exception as e:
+                fail_pipeline(f"❌ {str(e)}")
 
             # Success message
-            st.balloons()
+            if celebrate:
+                st.balloons()
             st.success("🎉 **Analysis Complete!** Your observation report is ready for download.")
 
     else:
         # Show disabled button with error message
         st.button("🎯 Generate Observation Report", disabled=True, use_container_width=True)
-        st.error(f"❌ {validation_error}")
+        st.error(f"❌ {inputs.error_message}")
 
     # --- Download Section ------------------------------------------------------
     if st.session_state.observation_report:
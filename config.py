@@ -1,8 +1,7 @@
 # --- Configuration and Setup -----------------------------------------------
 import os
+import threading
 import streamlit as st
-from google import genai
-from google.genai import types
 
 # --- API Configuration -----------------------------------------------------
 def get_api_key():
@@ -13,23 +12,54 @@ def get_api_key():
         st.stop()
     return API_KEY
 
+@st.cache_resource
 def create_client():
-    """Create and return the Gemini client"""
+    """Create and return the Gemini client (shared across reruns so its connection pool is reused)"""
+    from google import genai
     return genai.Client(api_key=get_api_key())
 
+def warm_up_client():
+    """
+    Build the client and open its connection, once per session, so the first
+    transcription does not pay the SDK import and TLS setup. Called once audio
+    has been uploaded, not on every page load. The client is built here on the
+    script thread; only the network round trip runs in the background thread
+    """
+    if st.session_state.get("client_warmed"):
+        return
+    st.session_state.client_warmed = True
+    try:
+        if not st.secrets.get("GEMINI_API_KEY", ""):
+            return  # get_api_key reports the missing key when Generate is pressed
+    except Exception:
+        return  # No secrets file at all; same as above
+    client = create_client()
+    
+    def _warm():
+        try:
+            client.models.count_tokens(model=TRANSCRIPTION_MODEL, contents="warmup")
+        except Exception:
+            pass  # Best effort only; real calls surface their own errors
+    
+    threading.Thread(target=_warm, name="gemini-warmup", daemon=True).start()
+
+@st.cache_data
 def load_developer_prompt():
     """Load system/developer prompt from identity.txt"""
     with open("identity.txt", "r", encoding="utf-8") as f:
         return f.read()
 
+@st.cache_data
 def load_solo_prompt():
     """Load system/developer prompt for solo teaching mode from identity_solo.txt"""
     with open("identity_solo.txt", "r", encoding="utf-8") as f:
         return f.read()
 
 # --- Generation Configs ----------------------------------------------------
+@st.cache_resource
 def get_generation_configs():
     """Create and return generation configurations for observation mode"""
+    from google.genai import types
     system_instructions = load_developer_prompt()
     search_tool = types.Tool(google_search=types.GoogleSearch())
 
@@ -40,16 +70,20 @@ def get_generation_configs():
         max_output_tokens=8192,
     )
 
+    # Transcription is verbatim copying, not reasoning: skip the thinking pass
     transcription_cfg = types.GenerateContentConfig(
         system_instruction=system_instructions,
         temperature=1.0,
         max_output_tokens=8192,
+        thinking_config=types.ThinkingConfig(thinking_budget=0),
     )
 
     return generation_cfg, transcription_cfg
 
+@st.cache_resource
 def get_solo_config():
     """Create and return generation configuration for solo teaching mode"""
+    from google.genai import types
     system_instructions = load_solo_prompt()
     
     solo_cfg = types.GenerateContentConfig(
@@ -92,3 +126,39 @@ PAGE_CONFIG = {
     "layout": "wide",
     "initial_sidebar_state": "collapsed",
 }
+
+# Balloons when a report is ready; BOT3_CELEBRATE=0 turns them off for scripted
+# or test runs
+CELEBRATE = os.environ.get("BOT3_CELEBRATE", "1") != "0"
+
+# Long-recording transcription: WAV uploads are cut into chunks of this many
+# seconds, and up to this many chunks per file are transcribed at once (twice
+# this across the teacher and observer files, which share one worker pool).
+# Each chunk after the first starts TRANSCRIPTION_CHUNK_OVERLAP_SECONDS early
+# so words at a cut are not lost
+TRANSCRIPTION_CHUNK_SECONDS = 300
+TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = 2
+TRANSCRIPTION_MAX_PARALLEL_CHUNKS = 4
+
+# Transcription model routing: clips shorter than TRANSCRIPTION_LITE_MAX_SECONDS
+# go to the lighter model. Duration is read from WAV headers; for compressed
+# formats it is estimated from size at TRANSCRIPTION_ASSUMED_BYTES_PER_SECOND
+# (128 kbps)
+TRANSCRIPTION_MODEL = "gemini-flash-latest"
+TRANSCRIPTION_LITE_MODEL = "gemini-flash-lite-latest"
+TRANSCRIPTION_LITE_MAX_SECONDS = 120
+TRANSCRIPTION_ASSUMED_BYTES_PER_SECOND = 16_000
+
+# WAV uploads are downmixed to mono 16-bit at this rate before transcription
+ASR_SAMPLE_RATE = 16_000
+
+# Silence skipping: 30 ms frames quieter than SILENCE_THRESHOLD_DBFS, in runs of
+# at least SILENCE_MIN_SECONDS, are cut from WAV audio before upload, keeping
+# SILENCE_PAD_SECONDS at each edge. Conservative so soft singing is kept
+SILENCE_THRESHOLD_DBFS = -50
+SILENCE_MIN_SECONDS = 3.0
+SILENCE_PAD_SECONDS = 0.2
+
+# Upload preflight: larger or non-audio files are rejected before any API call
+MAX_AUDIO_UPLOAD_MB = 200
+ACCEPTED_VIDEO_CONTAINERS = ("video/webm", "video/mp4")
@@ -1,9 +1,10 @@
 # --- Lesson Analysis and AI Generation Functions ---------------------------
 from google.genai import types
+from .llm_cache import cached_generate
 import prompts
 
 # --- Lesson Analysis -------------------------------------------------------
-def analyze_lesson_context(transcription: str, client, config) -> str:
+def analyze_lesson_context(transcription: str, client, config, use_cache: bool = True) -> str:
     """
     Analyze the lesson to identify type, grade level, and focus
     
@@ -11,6 +12,7 @@ def analyze_lesson_context(transcription: str, client, config) -> str:
         transcription: Teacher audio transcription
         client: Gemini API client
         config: Generation configuration
+        use_cache: False to bypass a cached answer and regenerate
     
     Returns:
         Analysis summary as string
@@ -27,18 +29,13 @@ Transcription:
 
 Provide a concise analysis in 2-3 sentences."""
         
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=[types.Content(parts=[types.Part(text=prompt)])],
-            config=config,
-        )
-        return response.text
+        return cached_generate(client, prompt, config, use_cache=use_cache)
     except Exception as e:
         return f"Lesson analysis could not be completed: {str(e)}"
 
 
 # --- Best Practices Research -----------------------------------------------
-def research_best_practices(lesson_analysis: str, client, config) -> str:
+def research_best_practices(lesson_analysis: str, client, config, use_cache: bool = True) -> str:
     """
     Research relevant best practices based on lesson context
     
@@ -46,6 +43,7 @@ def research_best_practices(lesson_analysis: str, client, config) -> str:
         lesson_analysis: Output from analyze_lesson_context
         client: Gemini API client
         config: Generation configuration (with search tool)
+        use_cache: False to bypass a cached answer and regenerate
     
     Returns:
         Research summary as string
@@ -62,17 +60,77 @@ Focus on:
 
 Provide a concise summary with specific, actionable insights."""
         
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=[types.Content(parts=[types.Part(text=prompt)])],
-            config=config,
-        )
-        return response.text
+        return cached_generate(client, prompt, config, use_cache=use_cache)
     except Exception as e:
         return f"Best practices research completed with general music education principles. (Note: {str(e)})"
 
 
+# --- Combined Analysis + Research -----------------------------------------
+def analyze_and_research(transcript_context: str, client, config, use_cache: bool = True) -> tuple[str, str]:
+    """
+    Analyze the lesson and research best practices in a single API call
+    
+    The transcript context is sent as its own leading part. It is built from
+    the pre-alignment text, so it matches the report call's leading part (and
+    shares a cacheable prefix with it) only when alignment did not change it.
+    Falls back to separate analyze_lesson_context / research_best_practices
+    calls if the combined response cannot be parsed.
+    
+    Args:
+        transcript_context: Output of prompts.get_transcript_context
+        client: Gemini API client
+        config: Generation configuration (with search tool)
+        use_cache: False to bypass cached answers and regenerate
+    
+    Returns:
+        Tuple of (lesson_analysis, best_practices)
+    """
+    result_text = ""
+    try:
+        prompt = prompts.get_analysis_and_research_prompt()
+        result_text = cached_generate(client, [transcript_context, prompt], config, use_cache=use_cache) or ""
+    except Exception:
+        result_text = ""
+    
+    if "LESSON_ANALYSIS:" in result_text and "BEST_PRACTICES:" in result_text:
+        analysis_part, practices_part = result_text.split("BEST_PRACTICES:", 1)
+        lesson_analysis = analysis_part.split("LESSON_ANALYSIS:", 1)[1].strip()
+        best_practices = practices_part.strip()
+        if lesson_analysis and best_practices:
+            return lesson_analysis, best_practices
+    
+    # Fallback: two separate round-trips
+    lesson_analysis = analyze_lesson_context(transcript_context, client, config, use_cache)
+    best_practices = research_best_practices(lesson_analysis, client, config, use_cache)
+    return lesson_analysis, best_practices
+
+
 # --- Report Generation Prompt Call ----------------------------------------
+def _build_report_contents(
+    lesson_analysis: str,
+    best_practices: str,
+    aligned_teacher: str,
+    aligned_observer: str,
+    evaluation_criteria: str,
+    report_sections: list,
+    report_length: str,
+    input_summary: str
+) -> list:
+    """Build report request contents: transcript context first, then the report instructions"""
+    transcript_context = prompts.get_transcript_context(aligned_teacher, aligned_observer)
+    prompt = prompts.get_report_generation_prompt(
+        lesson_analysis,
+        best_practices,
+        aligned_teacher,
+        aligned_observer,
+        evaluation_criteria,
+        report_sections,
+        report_length,
+        input_summary
+    )
+    return [types.Content(role="user", parts=[types.Part(text=transcript_context), types.Part(text=prompt)])]
+
+
 def generate_observation_report(
     lesson_analysis: str,
     best_practices: str,
@@ -82,7 +140,8 @@ def generate_observation_report(
     report_sections: list,
     report_length: str,
     client,
-    config
+    config,
+    input_summary: str = ""
 ) -> str:
     """
     Generate comprehensive observation report
@@ -96,24 +155,26 @@ def generate_observation_report(
         report_sections: Sections to include
         report_length: Brief/Standard/Comprehensive
         client, config: Gemini client and generation config
+        input_summary: Human-readable list of the inputs provided
     
     Returns:
         The generated report text
     """
     try:
-        prompt = prompts.get_report_generation_prompt(
+        contents = _build_report_contents(
             lesson_analysis,
             best_practices,
             aligned_teacher,
             aligned_observer,
             evaluation_criteria,
             report_sections,
-            report_length
+            report_length,
+            input_summary
         )
         
         response = client.models.generate_content(
             model="gemini-flash-latest",
-            contents=[types.Content(parts=[types.Part(text=prompt)])],
+            contents=contents,
             config=config,
         )
         return response.text
@@ -121,6 +182,49 @@ def generate_observation_report(
         raise Exception(f"Report generation failed: {str(e)}")
 
 
+def generate_observation_report_stream(
+    lesson_analysis: str,
+    best_practices: str,
+    aligned_teacher: str,
+    aligned_observer: str,
+    evaluation_criteria: str,
+    report_sections: list,
+    report_length: str,
+    client,
+    config,
+    input_summary: str = ""
+):
+    """
+    Stream the observation report as Gemini generates it
+    
+    Takes the same arguments as generate_observation_report.
+    
+    Yields:
+        Report text chunks in order
+    """
+    try:
+        contents = _build_report_contents(
+            lesson_analysis,
+            best_practices,
+            aligned_teacher,
+            aligned_observer,
+            evaluation_criteria,
+            report_sections,
+            report_length,
+            input_summary
+        )
+        
+        for chunk in client.models.generate_content_stream(
+            model="gemini-flash-latest",
+            contents=contents,
+            config=config,
+        ):
+            if chunk.text:
+                yield chunk.text
+    except Exception as e:
+        raise Exception(f"Report generation failed: {str(e)}")
+
+
 # --- Solo Teaching Feedback Conversation ----------------------------------
 def solo_feedback_conversation(
     transcription: str,
@@ -0,0 +1,163 @@
+# --- Audio Preprocessing ---------------------------------------------------
+import io
+import wave
+import numpy as np
+from config import (
+    ASR_SAMPLE_RATE,
+    SILENCE_THRESHOLD_DBFS,
+    SILENCE_MIN_SECONDS,
+    SILENCE_PAD_SECONDS,
+)
+
+_FRAME_SECONDS = 0.03
+
+# --- Speech Normalization --------------------------------------------------
+def normalize_for_asr(audio_bytes: bytes, file_extension: str) -> bytes:
+    """
+    Convert PCM WAV audio to mono 16-bit at ASR_SAMPLE_RATE before upload
+
+    Speech recognition gains nothing above 16 kHz mono, so a 48 kHz stereo
+    recording shrinks about 6x. Mono audio of at most 16 bits at or below
+    the target rate, compressed formats (which would need a decoder),
+    and WAV files the wave module cannot read are returned unchanged.
+    """
+    if file_extension.lower() != "wav":
+        return audio_bytes
+
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as source:
+            params = source.getparams()
+            frames = source.readframes(params.nframes)
+    except (wave.Error, EOFError):
+        return audio_bytes
+
+    if params.nchannels == 1 and params.sampwidth <= 2 and params.framerate <= ASR_SAMPLE_RATE:
+        return audio_bytes
+
+    samples = _pcm_to_float(frames, params.sampwidth)
+    if samples is None:
+        return audio_bytes
+    # Downmix: average the interleaved channels
+    samples = samples.reshape(-1, params.nchannels).mean(axis=1)
+
+    if params.framerate > ASR_SAMPLE_RATE:
+        samples = _resample(samples, params.framerate, ASR_SAMPLE_RATE)
+        framerate = ASR_SAMPLE_RATE
+    else:
+        framerate = params.framerate
+
+    pcm = np.clip(np.round(samples * 32767.0), -32768, 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as target:
+        target.setnchannels(1)
+        target.setsampwidth(2)
+        target.setframerate(framerate)
+        target.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _pcm_to_float(frames: bytes, sampwidth: int):
+    """Decode little-endian PCM frames to float samples in [-1, 1], or None if unsupported"""
+    if sampwidth == 1:
+        return (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if sampwidth == 2:
+        return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    if sampwidth == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        return values.astype(np.float32) / 8388608.0
+    if sampwidth == 4:
+        return np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    return None
+
+
+def _resample(samples: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Downsample mono audio. Integer ratios (48k, 32k) average each block of
+    samples; other rates (44.1k) are box-filtered and linearly interpolated.
+    """
+    if source_rate % target_rate == 0:
+        factor = source_rate // target_rate
+        usable = len(samples) - len(samples) % factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1)
+
+    width = max(1, round(source_rate / target_rate))
+    filtered = np.convolve(samples, np.ones(width, dtype=np.float32) / width, mode="same")
+    target_length = int(len(samples) * target_rate / source_rate)
+    positions = np.arange(target_length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(filtered)), filtered).astype(np.float32)
+
+
+# --- Silence Removal -------------------------------------------------------
+def strip_silence(audio_bytes: bytes, file_extension: str) -> tuple:
+    """
+    Cut long silent stretches out of mono 16-bit WAV audio
+
+    Silence is detected per 30 ms frame by RMS level. Only runs of at least
+    SILENCE_MIN_SECONDS are removed, each keeping SILENCE_PAD_SECONDS of
+    audio at both edges.
+
+    Returns:
+        Tuple of (audio_bytes, time_map). time_map lists
+        (output_start_seconds, source_start_seconds) for each kept span so
+        timestamps in the transcription can be mapped back to the original
+        recording; it is empty when nothing was cut.
+    """
+    if file_extension.lower() != "wav":
+        return audio_bytes, []
+
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as source:
+            params = source.getparams()
+            if params.nchannels != 1 or params.sampwidth != 2:
+                return audio_bytes, []
+            frames = source.readframes(params.nframes)
+    except (wave.Error, EOFError):
+        return audio_bytes, []
+
+    samples = np.frombuffer(frames, dtype="<i2")
+    frame_len = max(1, int(params.framerate * _FRAME_SECONDS))
+    frame_count = len(samples) // frame_len
+    if frame_count == 0:
+        return audio_bytes, []
+
+    # Per-frame RMS against the threshold converted to a 16-bit amplitude
+    blocks = samples[:frame_count * frame_len].reshape(frame_count, frame_len).astype(np.float32)
+    rms = np.sqrt(np.mean(blocks * blocks, axis=1))
+    silent = rms < 32768.0 * 10 ** (SILENCE_THRESHOLD_DBFS / 20)
+
+    # Sample ranges to cut: long silent runs, shrunk by the pad on each side
+    min_frames = int(SILENCE_MIN_SECONDS / _FRAME_SECONDS)
+    pad = int(params.framerate * SILENCE_PAD_SECONDS)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    cuts = [
+        (start * frame_len + pad, end * frame_len - pad)
+        for start, end in zip(edges[::2], edges[1::2])
+        if end - start >= min_frames
+    ]
+    if not cuts:
+        return audio_bytes, []
+
+    kept_spans = []
+    position = 0
+    for cut_start, cut_end in cuts:
+        if cut_start > position:
+            kept_spans.append((position, cut_start))
+        position = cut_end
+    if position < len(samples):
+        kept_spans.append((position, len(samples)))
+    if not kept_spans:
+        return audio_bytes, []
+
+    time_map = []
+    output_position = 0
+    for span_start, span_end in kept_spans:
+        time_map.append((output_position / params.framerate, span_start / params.framerate))
+        output_position += span_end - span_start
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as target:
+        target.setparams(params)
+        target.writeframes(b"".join(samples[start:end].tobytes() for start, end in kept_spans))
+    return buffer.getvalue(), time_map
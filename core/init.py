@@ -1,9 +1,11 @@
 # Core module initialization
-from .transcription import transcribe_audio, align_transcriptions
+from .transcription import transcribe_audio, hash_audio, get_cached_transcription, align_transcriptions, timestamps_overlap
 from .analysis import (
     analyze_lesson_context,
     research_best_practices,
+    analyze_and_research,
     generate_observation_report,
+    generate_observation_report_stream,
     solo_feedback_conversation
 )
 from .pdf_generation import (
@@ -27,10 +29,15 @@ from .utils import (
 
 __all__ = [
     'transcribe_audio',
+    'hash_audio',
+    'get_cached_transcription',
     'align_transcriptions',
+    'timestamps_overlap',
     'analyze_lesson_context',
     'research_best_practices',
+    'analyze_and_research',
     'generate_observation_report',
+    'generate_observation_report_stream',
     'solo_feedback_conversation',
     'create_observation_report_pdf',
     'create_solo_session_pdf',
@@ -0,0 +1,166 @@
+# --- LLM Response Cache ----------------------------------------------------
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from google.genai import types
+
+# --- Cache Store -----------------------------------------------------------
+class LLMCache:
+    """
+    Thread-safe in-memory LRU cache for LLM responses with a time-to-live.
+    Tracks hit/miss counts so the app can report cache effectiveness.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: int = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: str) -> None:
+        """Store value under key, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class DiskCache:
+    """
+    Content-addressed text cache stored as one file per key, so results
+    survive app restarts and are shared by every session on the host.
+    Entries older than ttl seconds are treated as missing and deleted; expired
+    files are also swept from the directory at most once per prune_interval.
+    """
+
+    def __init__(self, directory: str, ttl: int = 7 * 86400, prune_interval: int = 3600):
+        self.directory = directory
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key: str):
+        """Return the cached text for key, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Write value under key; cache write failures are never fatal"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            pass
+        self._prune_if_due()
+
+    def _prune_if_due(self) -> None:
+        """Delete expired entries and leftover temp files, throttled by prune_interval"""
+        now = time.time()
+        with self._prune_lock:
+            if now < self._next_prune:
+                return
+            self._next_prune = now + self.prune_interval
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and now - entry.stat().st_mtime > self.ttl:
+                            os.remove(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+
+_response_cache = LLMCache()
+_disk_cache = DiskCache(os.path.join(".cache", "llm"))
+transcript_cache = DiskCache(os.path.join(".cache", "transcripts"))
+
+
+# --- Cache Keys ------------------------------------------------------------
+def make_cache_key(model: str, prompt, config) -> str:
+    """
+    Build a stable key from the model, prompt text, and generation config.
+    The config (system instruction, temperature, tools) is part of the key so
+    calls with different settings never share an entry.
+    """
+    config_json = config.model_dump_json(exclude_none=True) if config is not None else ""
+    payload = json.dumps({"model": model, "prompt": prompt, "config": config_json}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --- Cached Generation -----------------------------------------------------
+def cached_generate(client, prompt, config, model: str = "gemini-flash-latest", persist: bool = False, use_cache: bool = True) -> str:
+    """
+    Generate text for a text-only request, reusing a previous response
+    for an identical (model, prompt, config) request.
+
+    prompt may be a single string or a list of strings sent as separate
+    parts, in order. With persist=True the response is also stored on disk
+    so it survives restarts. With use_cache=False any stored response is
+    ignored and the fresh one replaces it. Only non-empty responses are
+    cached; API errors propagate to the caller.
+    """
+    prompt_parts = [prompt] if isinstance(prompt, str) else list(prompt)
+    key = make_cache_key(model, prompt_parts, config)
+    if use_cache:
+        cached = _response_cache.get(key)
+        if cached is None and persist:
+            cached = _disk_cache.get(key)
+            if cached is not None:
+                _response_cache.set(key, cached)
+        if cached is not None:
+            return cached
+
+    response = client.models.generate_content(
+        model=model,
+        contents=[types.Content(parts=[types.Part(text=part) for part in prompt_parts])],
+        config=config,
+    )
+    text = response.text
+    if text:
+        _response_cache.set(key, text)
+        if persist:
+            _disk_cache.set(key, text)
+    return text
+
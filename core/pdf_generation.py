@@ -1,8 +1,69 @@
 # --- PDF Generation Functions ----------------------------------------------
+import re
 from datetime import datetime
+from itertools import zip_longest
 from fpdf import FPDF
 from .utils import validate_pdf_inputs, sanitize_text_for_pdf, validate_text_content, parse_segments
 
+# Markdown emphasis the model sometimes emits despite instructions
+_BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+_ITALIC_RE = re.compile(r'\*(.+?)\*')
+
+# Report line classification: bullets, and first words that mark a line as
+# a sentence rather than a subsection title
+_BULLET_STARTS = ("- ", "* ", "• ")
+_SENTENCE_STARTS = frozenset({"The", "This", "When", "After", "Before", "During", "To", "In", "As", "For", "With"})
+
+# Report line kinds returned by _classify_line
+_LINE_BLANK, _LINE_SECTION, _LINE_SUBSECTION, _LINE_BULLET, _LINE_TEXT = range(5)
+
+
+def _classify_line(line: str) -> int:
+    """Classify a stripped report line for styling"""
+    if not line:
+        return _LINE_BLANK
+    tokens = line.split()
+    word_count = len(tokens)
+
+    # ALL CAPS section header (main sections): all uppercase, ends with a colon
+    if line.isupper() and line.endswith(":") and word_count <= 5:
+        return _LINE_SECTION
+    # Bulleted lines
+    if line.startswith(_BULLET_STARTS):
+        return _LINE_BULLET
+    # Subsection header (short descriptive title): 2-12 words, starts with a
+    # capital, doesn't end with sentence punctuation, and doesn't start with
+    # a common sentence word or a speaker label
+    if (2 <= word_count <= 12 and
+            tokens[0] not in _SENTENCE_STARTS and
+            not line.endswith((".", "!", "?", ",", ";")) and
+            line[0].isupper() and
+            not line.startswith(("Teacher:", "Student:", "Observer:"))):
+        return _LINE_SUBSECTION
+    return _LINE_TEXT
+
+
+def _new_pdf(auto_page_break: bool = True) -> FPDF:
+    """
+    Create an export document with its first page and the shared 12 mm
+    margins. The page is added before the margins change, so the first
+    cursor position stays at FPDF's default margin as it always has.
+    """
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_margins(12, 12, 12)
+    if auto_page_break:
+        pdf.set_auto_page_break(auto=True, margin=12)
+    else:
+        pdf.set_auto_page_break(auto=False)
+    return pdf
+
+
+def _strip_emphasis(text: str) -> str:
+    """Remove bold markers, then italic markers, keeping the text inside"""
+    return _ITALIC_RE.sub(r'\1', _BOLD_RE.sub(r'\1', text))
+
+
 # --- PDF Generation: Observation Report ------------------------------------
 def create_observation_report_pdf(
     report_text: str,
@@ -20,10 +81,7 @@ def create_observation_report_pdf(
         raise ValueError(f"PDF input validation failed: {error_msg}")
     
     try:
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_margins(12, 12, 12)
-        pdf.set_auto_page_break(auto=True, margin=12)
+        pdf = _new_pdf()
 
         # Sanitize inputs
         report_text = sanitize_text_for_pdf(report_text)
@@ -32,29 +90,25 @@ def create_observation_report_pdf(
         date_str = sanitize_text_for_pdf(date_str)
 
         # CRITICAL: Remove markdown formatting from report text
-        import re
-        # Remove bold markers
-        report_text = re.sub(r'\*\*(.+?)\*\*', r'\1', report_text)
-        # Remove italic markers  
-        report_text = re.sub(r'\*(.+?)\*', r'\1', report_text)
+        report_text = _strip_emphasis(report_text)
 
         usable = pdf.epw
 
         # Title
-        pdf.set_font("Arial", "B", 16)
+        pdf.set_font("Helvetica", "B", 16)
         pdf.set_x(pdf.l_margin)
         pdf.cell(usable, 10, "Music Teacher Observation Report", ln=True, align="C")
         pdf.ln(3)
 
         # Date only (no time)
-        pdf.set_font("Arial", "I", 10)
+        pdf.set_font("Helvetica", "I", 10)
         pdf.set_x(pdf.l_margin)
         pdf.cell(usable, 6, date_str, ln=True, align="C")
         pdf.ln(5)
 
         # Scope disclaimer if no teacher audio
         if not has_teacher_audio:
-            pdf.set_font("Arial", "I", 9)
+            pdf.set_font("Helvetica", "I", 9)
             pdf.set_text_color(100, 100, 100)
             pdf.set_x(pdf.l_margin)
             pdf.multi_cell(
@@ -67,7 +121,7 @@ def create_observation_report_pdf(
             pdf.ln(3)
 
         # Teacher and Observer names
-        pdf.set_font("Arial", "B", 11)
+        pdf.set_font("Helvetica", "B", 11)
         pdf.set_x(pdf.l_margin)
         if teacher_name and teacher_name != "Not specified":
             pdf.cell(usable, 6, f"Teacher: {teacher_name}", ln=True, align="L")
@@ -77,48 +131,45 @@ def create_observation_report_pdf(
         pdf.ln(5)
 
         # Report content
-        pdf.set_font("Arial", "", 10)
+        pdf.set_font("Helvetica", "", 10)
         line_height = 5
 
-        lines = report_text.split("\n")
-        for raw_line in lines:
+        # Consecutive body and bullet lines share one style, so they are
+        # rendered together: one multi_cell per run instead of one per line
+        body_lines = []
+
+        def flush_body():
+            if body_lines:
+                pdf.set_x(pdf.l_margin)
+                pdf.multi_cell(usable, line_height, "\n".join(body_lines))
+                body_lines.clear()
+
+        for raw_line in report_text.split("\n"):
             line = raw_line.strip()
-            if not line:
-                pdf.ln(3)
+            kind = _classify_line(line)
+            if kind == _LINE_BULLET or kind == _LINE_TEXT:
+                body_lines.append(line)
                 continue
-
-            # Check if line is an ALL CAPS section header (main sections)
-            # Must be all uppercase and end with colon
-            if line.isupper() and line.endswith(":") and len(line.split()) <= 5:
-                pdf.set_font("Arial", "B", 11)
+            flush_body()
+            if kind == _LINE_BLANK:
+                pdf.ln(3)
+            elif kind == _LINE_SECTION:
+                pdf.set_font("Helvetica", "B", 11)
                 pdf.set_x(pdf.l_margin)
                 pdf.multi_cell(usable, line_height, line)
-                pdf.set_font("Arial", "", 10)
+                pdf.set_font("Helvetica", "", 10)
                 pdf.ln(2)
-            # Check if line is a subsection header (short descriptive title)
-            # Characteristics: 2-12 words, starts with capital, doesn't end with sentence punctuation
-            # Not a bullet, not part of a sentence (doesn't start with common sentence words)
-            elif (len(line.split()) >= 2 and len(line.split()) <= 12 and 
-                  not line.startswith(("- ", "* ", "• ", "The ", "This ", "When ", "After ", "Before ", "During ", "To ", "In ", "As ", "For ", "With ")) and
-                  not line.endswith((".","!","?",",",";")) and
-                  line[0].isupper() and
-                  not line.startswith(("Teacher:", "Student:", "Observer:"))):
-                pdf.set_font("Arial", "B", 10)
-                pdf.set_x(pdf.l_margin)
-                pdf.multi_cell(usable, line_height, line)
-                pdf.set_font("Arial", "", 10)
-                pdf.ln(1)
-            # Bulleted lines
-            elif line.startswith(("- ", "* ", "• ")):
-                pdf.set_x(pdf.l_margin)
-                pdf.multi_cell(usable, line_height, line)
             else:
+                pdf.set_font("Helvetica", "B", 10)
                 pdf.set_x(pdf.l_margin)
                 pdf.multi_cell(usable, line_height, line)
+                pdf.set_font("Helvetica", "", 10)
+                pdf.ln(1)
+        flush_body()
 
         # Add disclaimer immediately after content (not at bottom of page)
         pdf.ln(8)  # Small space before disclaimer
-        pdf.set_font("Arial", "I", 9)
+        pdf.set_font("Helvetica", "I", 9)
         pdf.set_text_color(100, 100, 100)
         pdf.set_x(pdf.l_margin)
         pdf.multi_cell(
@@ -137,6 +188,27 @@ def create_observation_report_pdf(
 
 
 # --- PDF Generation: Solo Teaching Session Export -------------------------
+# Unit separator: whitespace to the long-token rule in sanitize_text_for_pdf,
+# so joined strings sanitize exactly as they would one by one
+_MESSAGE_SEPARATOR = "\x1f"
+_ROLE_LABELS = {"user": "You: "}
+_DEFAULT_ROLE_LABEL = "Coach: "
+
+
+def _sanitize_all(texts: list) -> list:
+    """Sanitize a list of strings in one pass over a joined string"""
+    if not texts:
+        return []
+    if any(_MESSAGE_SEPARATOR in text for text in texts):
+        return [sanitize_text_for_pdf(text) for text in texts]
+    return sanitize_text_for_pdf(_MESSAGE_SEPARATOR.join(texts)).split(_MESSAGE_SEPARATOR)
+
+
+def _sanitize_messages(chat_history: list) -> list:
+    """Sanitize every message's content in one pass over a joined string"""
+    return _sanitize_all([msg["content"] for msg in chat_history])
+
+
 def create_solo_session_pdf(
     transcription: str,
     chat_history: list,
@@ -145,10 +217,7 @@ def create_solo_session_pdf(
     """Generate a PDF export of solo teaching reflection session"""
     
     try:
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_margins(12, 12, 12)
-        pdf.set_auto_page_break(auto=True, margin=12)
+        pdf = _new_pdf()
 
         # Sanitize inputs
         transcription = sanitize_text_for_pdf(transcription)
@@ -157,56 +226,55 @@ def create_solo_session_pdf(
         usable = pdf.epw
 
         # Title
-        pdf.set_font("Arial", "B", 16)
+        pdf.set_font("Helvetica", "B", 16)
         pdf.set_x(pdf.l_margin)
         pdf.cell(usable, 10, "Solo Teaching Reflection Session", ln=True, align="C")
         pdf.ln(3)
 
         # Date
-        pdf.set_font("Arial", "I", 10)
+        pdf.set_font("Helvetica", "I", 10)
         pdf.set_x(pdf.l_margin)
         pdf.cell(usable, 6, date_str, ln=True, align="C")
         pdf.ln(5)
 
         # Conversation Section
-        pdf.set_font("Arial", "B", 12)
+        pdf.set_font("Helvetica", "B", 12)
         pdf.set_x(pdf.l_margin)
         pdf.cell(usable, 6, "REFLECTION CONVERSATION:", ln=True)
         pdf.ln(3)
 
         # Chat history
-        pdf.set_font("Arial", "", 10)
+        pdf.set_font("Helvetica", "", 10)
         line_height = 5
 
-        for msg in chat_history:
-            role_label = "You: " if msg["role"] == "user" else "Coach: "
-            content = sanitize_text_for_pdf(msg["content"])
-            
+        # Every row starts at the left margin: the label cell ends with a
+        # line break and pdf.ln() returns x to l_margin after each message
+        for msg, content in zip(chat_history, _sanitize_messages(chat_history)):
+            role_label = _ROLE_LABELS.get(msg["role"], _DEFAULT_ROLE_LABEL)
+
             # Role label in bold
-            pdf.set_font("Arial", "B", 10)
-            pdf.set_x(pdf.l_margin)
+            pdf.set_font("Helvetica", "B", 10)
             pdf.cell(usable, line_height, role_label, ln=True)
-            
+
             # Message content
-            pdf.set_font("Arial", "", 10)
-            pdf.set_x(pdf.l_margin)
+            pdf.set_font("Helvetica", "", 10)
             pdf.multi_cell(usable, line_height, content)
             pdf.ln(3)
 
         # Transcription section
         pdf.ln(5)
-        pdf.set_font("Arial", "B", 12)
+        pdf.set_font("Helvetica", "B", 12)
         pdf.set_x(pdf.l_margin)
         pdf.cell(usable, 6, "CLASSROOM AUDIO TRANSCRIPTION:", ln=True)
         pdf.ln(3)
 
-        pdf.set_font("Arial", "", 9)
+        pdf.set_font("Helvetica", "", 9)
         pdf.set_x(pdf.l_margin)
         pdf.multi_cell(usable, 4, transcription)
 
         # Add disclaimer
         pdf.ln(8)
-        pdf.set_font("Arial", "I", 9)
+        pdf.set_font("Helvetica", "I", 9)
         pdf.set_text_color(100, 100, 100)
         pdf.set_x(pdf.l_margin)
         pdf.multi_cell(
@@ -225,14 +293,51 @@ def create_solo_session_pdf(
 
 
 # --- PDF Generation: Dual Column Transcript --------------------------------
-def create_dual_column_pdf(teacher_text: str, observer_text: str) -> bytes:
-    """Generate a two-column PDF from both transcriptions with synchronized rows"""
+# Segment openers: a speaker label (bold when it belongs to the column) or
+# a music cue (italic)
+_ROLE_RE = re.compile(r'(Teacher|Student|Observer):|(<Music>)')
+_TEACHER_SPEAKERS = frozenset({"Teacher", "Student"})
+_OBSERVER_SPEAKERS = frozenset({"Observer"})
+
+
+def _styled_segments(segments: list, speakers: frozenset) -> list:
+    """Pair each transcript segment with its font style: bold speaker, italic music cue, or regular"""
+    styled = []
+    for segment in segments:
+        match = _ROLE_RE.match(segment)
+        if match is None:
+            style = ""
+        elif match.group(2):
+            style = "I"
+        else:
+            style = "B" if match.group(1) in speakers else ""
+        styled.append((segment, style))
+    return styled
+
+
+def _column_segments(content) -> list:
+    """Sanitized segments for one column, from transcript text or a list of pre-split segments"""
+    if isinstance(content, list):
+        return [segment for segment in _sanitize_all(content) if segment.strip()] or ["No content available."]
+    return parse_segments(sanitize_text_for_pdf(content))
+
+
+def create_dual_column_pdf(teacher_text, observer_text) -> bytes:
+    """
+    Generate a two-column PDF from both transcriptions with synchronized rows
+
+    Either column may be passed as transcript text or as a list of segments
+    that were already split, which skips parsing the text again.
+    """
     
-    is_valid, error = validate_text_content(teacher_text, "Teacher transcription")
+    # Pre-split segments are validated as the text they make up
+    teacher_check = "\n".join(teacher_text) if isinstance(teacher_text, list) else teacher_text
+    is_valid, error = validate_text_content(teacher_check, "Teacher transcription")
     if not is_valid:
         raise ValueError(f"Teacher transcription validation failed: {error}")
     
-    is_valid, error = validate_text_content(observer_text, "Observer transcription")
+    observer_check = "\n".join(observer_text) if isinstance(observer_text, list) else observer_text
+    is_valid, error = validate_text_content(observer_check, "Observer transcription")
     if not is_valid:
         if "empty" in error.lower():
             observer_text = "No observer audio or notes provided."
@@ -240,95 +345,77 @@ def create_dual_column_pdf(teacher_text: str, observer_text: str) -> bytes:
             raise ValueError(f"Observer transcription validation failed: {error}")
     
     try:
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=False)
-        pdf.set_margins(12, 12, 12)
+        pdf = _new_pdf(auto_page_break=False)
 
-        # Sanitize inputs
-        teacher_text = sanitize_text_for_pdf(teacher_text)
-        observer_text = sanitize_text_for_pdf(observer_text)
+        # Sanitize and split both columns
+        teacher_segments = _column_segments(teacher_text)
+        observer_segments = _column_segments(observer_text)
 
         # Title
-        pdf.set_font("Arial", "B", 16)
+        pdf.set_font("Helvetica", "B", 16)
         pdf.cell(0, 10, "Aligned Audio Transcription", ln=True, align="C")
         pdf.ln(3)
 
         # Date
-        pdf.set_font("Arial", "I", 10)
+        pdf.set_font("Helvetica", "I", 10)
         pdf.cell(0, 6, f"Generated: {datetime.now().strftime('%B %d, %Y')}", ln=True, align="C")
         pdf.ln(3)
 
         # AI Disclaimer
-        pdf.set_font("Arial", "I", 9)
+        pdf.set_font("Helvetica", "I", 9)
         pdf.set_text_color(100, 100, 100)
         pdf.multi_cell(0, 5, "Disclaimer: This transcription was created by AI. Please verify all important information for accuracy.", align="C")
         pdf.set_text_color(0, 0, 0)
         pdf.ln(5)
 
         # Column headers
-        pdf.set_font("Arial", "B", 11)
+        pdf.set_font("Helvetica", "B", 11)
         pdf.cell(95, 6, "Teacher Audio", border=1, align="C")
         pdf.cell(95, 6, "Observer Audio/Notes", border=1, align="C", ln=True)
         pdf.ln(2)
 
-        teacher_segments = parse_segments(teacher_text)
-        observer_segments = parse_segments(observer_text)
-        max_segments = max(len(teacher_segments), len(observer_segments))
+        # Styles are worked out once up front; the row loop then only
+        # switches fonts when consecutive segments differ
+        teacher_segments = _styled_segments(teacher_segments, _TEACHER_SPEAKERS)
+        observer_segments = _styled_segments(observer_segments, _OBSERVER_SPEAKERS)
 
         column_width = 92
         left_x = 9
         right_x = 109
         line_height = 4
-        page_bottom = 280
-
-        pdf.set_font("Arial", "", 9)
-        for i in range(max_segments):
-            teacher_seg = teacher_segments[i] if i < len(teacher_segments) else ""
-            observer_seg = observer_segments[i] if i < len(observer_segments) else ""
-
-            if pdf.get_y() > page_bottom:
+        # Start a new page once a row would begin within 17 mm of the page
+        # edge (280 mm on A4); rows are never split across pages
+        page_bottom = pdf.h - 17
+
+        # The row cursor is tracked locally and written back once at the end;
+        # each column is positioned explicitly with set_xy
+        pdf.set_font("Helvetica", "", 9)
+        current_style = ""
+        y = pdf.y
+        for teacher_seg, observer_seg in zip_longest(teacher_segments, observer_segments, fillvalue=("", "")):
+            if y > page_bottom:
                 pdf.add_page()
-                pdf.set_font("Arial", "", 9)
-
-            y_start = pdf.get_y()
-
-            # Left column (Teacher)
-            pdf.set_xy(left_x, y_start)
-            if teacher_seg:
-                if teacher_seg.startswith("Teacher:") or teacher_seg.startswith("Student:"):
-                    pdf.set_font("Arial", "B", 9)
-                    pdf.multi_cell(column_width, line_height, teacher_seg)
-                    pdf.set_font("Arial", "", 9)
-                elif teacher_seg.startswith("<Music>"):
-                    pdf.set_font("Arial", "I", 9)
-                    pdf.multi_cell(column_width, line_height, teacher_seg)
-                    pdf.set_font("Arial", "", 9)
-                else:
-                    pdf.multi_cell(column_width, line_height, teacher_seg)
-            teacher_y_end = pdf.get_y()
-
-            # Right column (Observer)
-            pdf.set_xy(right_x, y_start)
-            if observer_seg:
-                if observer_seg.startswith("Observer:"):
-                    pdf.set_font("Arial", "B", 9)
-                    pdf.multi_cell(column_width, line_height, observer_seg)
-                    pdf.set_font("Arial", "", 9)
-                elif observer_seg.startswith("<Music>"):
-                    pdf.set_font("Arial", "I", 9)
-                    pdf.multi_cell(column_width, line_height, observer_seg)
-                    pdf.set_font("Arial", "", 9)
-                else:
-                    pdf.multi_cell(column_width, line_height, observer_seg)
-            observer_y_end = pdf.get_y()
-
-            pdf.set_y(max(teacher_y_end, observer_y_end))
-            pdf.ln(2)
+                pdf.set_font("Helvetica", "", 9)
+                current_style = ""
+                y = pdf.y
+
+            # Left column (Teacher), then right column (Observer)
+            row_bottom = y
+            for x, (segment, style) in ((left_x, teacher_seg), (right_x, observer_seg)):
+                pdf.set_xy(x, y)
+                if segment:
+                    if style != current_style:
+                        pdf.set_font("Helvetica", style, 9)
+                        current_style = style
+                    pdf.multi_cell(column_width, line_height, segment)
+                    row_bottom = max(row_bottom, pdf.y)
+
+            y = row_bottom + 2
+        pdf.set_y(y)
 
         # Add disclaimer immediately after content
         pdf.ln(5)
-        pdf.set_font("Arial", "I", 8)
+        pdf.set_font("Helvetica", "I", 8)
         pdf.set_text_color(100, 100, 100)
         pdf.set_x(12)
         usable_width = pdf.w - 24
@@ -1,56 +1,320 @@
 # --- Audio Transcription and Alignment Logic -------------------------------
+import bisect
+import hashlib
+import io
+import wave
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import streamlit as st
 from google.genai import types
-from .utils import clean_transcription, remove_timestamps
+from .utils import TIMESTAMP_PATTERN, clean_transcription, remove_timestamps
+from .audio import normalize_for_asr, strip_silence
+from .llm_cache import cached_generate, make_cache_key, transcript_cache
+from config import (
+    TRANSCRIPTION_CHUNK_SECONDS,
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+    TRANSCRIPTION_MAX_PARALLEL_CHUNKS,
+    TRANSCRIPTION_MODEL,
+    TRANSCRIPTION_LITE_MODEL,
+    TRANSCRIPTION_LITE_MAX_SECONDS,
+    TRANSCRIPTION_ASSUMED_BYTES_PER_SECOND,
+)
 import prompts
 
+# Shared worker pool for chunk requests: threads are reused across files and
+# reruns. _run_chunks keeps each file to TRANSCRIPTION_MAX_PARALLEL_CHUNKS in
+# flight, so the teacher and observer files can be chunked at the same time
+_CHUNK_POOL = ThreadPoolExecutor(
+    max_workers=TRANSCRIPTION_MAX_PARALLEL_CHUNKS * 2,
+    thread_name_prefix="transcribe-chunk",
+)
+
 # --- Audio Transcription ---------------------------------------------------
-def transcribe_audio(audio_file, is_teacher: bool, client, config) -> str:
+def transcribe_audio(audio_file, is_teacher: bool, client, config, file_extension: str = None, audio_digest: str = None, on_chunk_done=None) -> str:
     """
     Transcribe audio file using Gemini API
     
     Args:
-        audio_file: Uploaded audio file from Streamlit
+        audio_file: Audio bytes read once by the caller, or an uploaded
+            audio file from Streamlit (read here)
         is_teacher: True for teacher audio, False for observer audio
         client: Gemini API client
         config: Generation configuration
+        file_extension: Audio format (e.g. "wav"); required with raw bytes
+        audio_digest: hash_audio() of the bytes, if the caller already has it
+        on_chunk_done: Optional callback(done, total) run as each chunk of a
+            long recording finishes. It runs on the calling thread, not on a
+            chunk worker.
     
     Returns:
         Transcription text
     """
     try:
-        # Reset file pointer and read bytes
-        audio_file.seek(0)
-        audio_bytes = audio_file.read()
+        if isinstance(audio_file, (bytes, bytearray)):
+            audio_bytes = bytes(audio_file)
+        else:
+            # Reset file pointer and read bytes
+            audio_file.seek(0)
+            audio_bytes = audio_file.read()
+            file_extension = audio_file.name.split('.')[-1]
         
         # Validate file is not empty
         if len(audio_bytes) == 0:
             raise ValueError(f"{'Teacher' if is_teacher else 'Observer'} audio file is empty or corrupted")
         
-        # Create audio part
-        file_extension = audio_file.name.split('.')[-1]
-        audio_part = types.Part.from_bytes(
-            data=audio_bytes, 
-            mime_type=f"audio/{file_extension}"
-        )
+        mime_type = f"audio/{file_extension}"
         
         # Select appropriate prompt
         prompt = prompts.TEACHER_TRANSCRIPTION_PROMPT if is_teacher else prompts.OBSERVER_TRANSCRIPTION_PROMPT
         
-        # Generate transcription
-        response = client.models.generate_content(
-            model="gemini-flash-latest",
-            contents=[types.Content(parts=[types.Part(text=prompt), audio_part])],
-            config=config,
-        )
+        # Short clips do not need the full model
+        model = _select_transcription_model(audio_bytes, file_extension)
+        
+        # Identical audio + prompt + config was already transcribed: reuse it
+        cache_key = _transcription_cache_key(audio_bytes, file_extension, is_teacher, config, audio_digest)
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Fewer bytes on the wire: mono 16 kHz is all speech recognition needs
+        audio_bytes = normalize_for_asr(audio_bytes, file_extension)
+        
+        # Long silences are not sent; time_map puts timestamps back on the original timeline
+        audio_bytes, time_map = strip_silence(audio_bytes, file_extension)
+        
+        # Long recordings are split and transcribed in parallel
+        chunks = _split_audio(audio_bytes, file_extension)
+        if len(chunks) == 1:
+            transcription = _restore_timestamps(
+                _transcribe_single_chunk(audio_bytes, mime_type, prompt, client, config, model),
+                time_map,
+            )
+            if transcription:
+                transcript_cache.set(cache_key, transcription)
+            return transcription
+        
+        def _transcribe_chunk(chunk):
+            offset_seconds, chunk_bytes = chunk
+            text = _transcribe_single_chunk(chunk_bytes, mime_type, prompt, client, config, model)
+            return _offset_timestamps(text, offset_seconds)
+        
+        chunk_texts = _run_chunks(chunks, _transcribe_chunk, on_chunk_done)
         
-        return response.text
+        transcription = _restore_timestamps(_merge_chunk_texts(chunk_texts), time_map)
+        if transcription.strip():
+            transcript_cache.set(cache_key, transcription)
+        return transcription
         
     except Exception as e:
         raise Exception(f"{'Teacher' if is_teacher else 'Observer'} transcription failed: {str(e)}")
 
 
+def get_cached_transcription(audio_bytes: bytes, file_extension: str, is_teacher: bool, config, audio_digest: str = None):
+    """
+    Return the stored transcription for this exact audio and config, or None
+    
+    Lets the caller report a cache hit before scheduling any API work.
+    """
+    if not audio_bytes:
+        return None
+    return transcript_cache.get(_transcription_cache_key(audio_bytes, file_extension, is_teacher, config, audio_digest))
+
+
+def hash_audio(audio_bytes: bytes) -> str:
+    """
+    Content hash used in transcription cache keys
+    
+    Compute it once per upload and pass it to get_cached_transcription and
+    transcribe_audio, so large recordings are not hashed twice.
+    """
+    return hashlib.sha256(audio_bytes).hexdigest()
+
+
+def _transcription_cache_key(audio_bytes: bytes, file_extension: str, is_teacher: bool, config, audio_digest: str = None) -> str:
+    """Key a transcription by audio content, format, prompt, model, and config"""
+    prompt = prompts.TEACHER_TRANSCRIPTION_PROMPT if is_teacher else prompts.OBSERVER_TRANSCRIPTION_PROMPT
+    model = _select_transcription_model(audio_bytes, file_extension)
+    audio_digest = audio_digest or hash_audio(audio_bytes)
+    return make_cache_key(model, [audio_digest, f"audio/{file_extension}", prompt], config)
+
+
+def _transcribe_single_chunk(audio_bytes: bytes, mime_type: str, prompt: str, client, config, model: str = TRANSCRIPTION_MODEL) -> str:
+    """Send one piece of audio to the Gemini API and return its transcription"""
+    audio_part = types.Part.from_bytes(
+        data=audio_bytes, 
+        mime_type=mime_type
+    )
+    
+    response = client.models.generate_content(
+        model=model,
+        contents=[types.Content(parts=[types.Part(text=prompt), audio_part])],
+        config=config,
+    )
+    
+    return response.text
+
+
+# --- Model Routing ---------------------------------------------------------
+def _estimate_duration_seconds(audio_bytes: bytes, file_extension: str) -> float:
+    """
+    Return the clip length in seconds: exact for WAV, otherwise estimated
+    from the file size at TRANSCRIPTION_ASSUMED_BYTES_PER_SECOND
+    """
+    if file_extension.lower() == "wav":
+        try:
+            with wave.open(io.BytesIO(audio_bytes), "rb") as source:
+                return source.getnframes() / source.getframerate()
+        except (wave.Error, EOFError, ZeroDivisionError):
+            pass
+    return len(audio_bytes) / TRANSCRIPTION_ASSUMED_BYTES_PER_SECOND
+
+
+def _select_transcription_model(audio_bytes: bytes, file_extension: str) -> str:
+    """Pick the lite model for short clips and the full model for everything else"""
+    if _estimate_duration_seconds(audio_bytes, file_extension) < TRANSCRIPTION_LITE_MAX_SECONDS:
+        return TRANSCRIPTION_LITE_MODEL
+    return TRANSCRIPTION_MODEL
+
+
+# --- Audio Chunking --------------------------------------------------------
+def _run_chunks(chunks: list, transcribe_chunk, on_chunk_done=None) -> list:
+    """
+    Transcribe chunks on the shared pool, at most TRANSCRIPTION_MAX_PARALLEL_CHUNKS at a time
+
+    The next chunk is submitted only when one of this file's chunks finishes,
+    so a long recording never holds every pool worker. Returns the chunk
+    texts in chunk order; the first chunk error propagates.
+    """
+    chunk_futures = []
+    in_flight = set()
+    done = 0
+
+    def _collect(finished):
+        nonlocal done
+        for _ in finished:
+            done += 1
+            if on_chunk_done is not None:
+                on_chunk_done(done, len(chunks))
+
+    for chunk in chunks:
+        if len(in_flight) >= TRANSCRIPTION_MAX_PARALLEL_CHUNKS:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            _collect(finished)
+        future = _CHUNK_POOL.submit(transcribe_chunk, chunk)
+        chunk_futures.append(future)
+        in_flight.add(future)
+    _collect(as_completed(in_flight))
+    return [future.result() for future in chunk_futures]
+
+
+def _split_audio(
+    audio_bytes: bytes,
+    file_extension: str,
+    target_chunk_s: int = TRANSCRIPTION_CHUNK_SECONDS,
+    overlap_s: int = TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+) -> list:
+    """
+    Split PCM WAV audio into chunks of target_chunk_s seconds
+    
+    Every chunk after the first also starts overlap_s seconds before its
+    cut, so speech spanning a boundary appears whole in at least one chunk.
+    Compressed formats cannot be cut without a decoder, so they (and any WAV
+    the wave module cannot read) are returned as a single chunk.
+    
+    Returns:
+        List of (offset_seconds, chunk_bytes) tuples in playback order
+    """
+    if file_extension.lower() != "wav":
+        return [(0, audio_bytes)]
+    
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as source:
+            params = source.getparams()
+            frames_per_chunk = params.framerate * target_chunk_s
+            overlap_frames = params.framerate * overlap_s
+            if params.nframes <= frames_per_chunk:
+                return [(0, audio_bytes)]
+            
+            chunks = []
+            for start in range(0, params.nframes, frames_per_chunk):
+                read_start = max(0, start - overlap_frames)
+                source.setpos(read_start)
+                frames = source.readframes(start - read_start + frames_per_chunk)
+                buffer = io.BytesIO()
+                with wave.open(buffer, "wb") as target:
+                    target.setparams(params)
+                    target.writeframes(frames)
+                chunks.append((read_start // params.framerate, buffer.getvalue()))
+    except (wave.Error, EOFError):
+        return [(0, audio_bytes)]
+    
+    return chunks
+
+
+def _offset_timestamps(text: str, offset_seconds: int) -> str:
+    """Shift [MM:SS] timestamps in a chunk transcription by the chunk's start time"""
+    if not text or not offset_seconds:
+        return text or ""
+    
+    def _shift(match):
+        total = int(match.group(1)) * 60 + int(match.group(2)) + offset_seconds
+        return f"[{total // 60:02d}:{total % 60:02d}]"
+    
+    return TIMESTAMP_PATTERN.sub(_shift, text)
+
+
+def _restore_timestamps(text: str, time_map: list) -> str:
+    """Map [MM:SS] timestamps from silence-stripped audio back to the original recording"""
+    if not text or not time_map:
+        return text
+    
+    output_starts = [output_start for output_start, _ in time_map]
+    
+    def _restore(match):
+        seconds = int(match.group(1)) * 60 + int(match.group(2))
+        output_start, source_start = time_map[max(0, bisect.bisect_right(output_starts, seconds) - 1)]
+        total = int(source_start + seconds - output_start)
+        return f"[{total // 60:02d}:{total % 60:02d}]"
+    
+    return TIMESTAMP_PATTERN.sub(_restore, text)
+
+
+def _merge_chunk_texts(chunk_texts: list, lookback: int = 5) -> str:
+    """
+    Join chunk transcriptions in order, dropping the lines at the start of a
+    chunk that repeat the end of the previous one (the overlap region)
+    
+    Lines are compared without their timestamps, against the last lookback
+    lines kept so far.
+    """
+    merged_lines = []
+    for text in chunk_texts:
+        lines = (text or "").split("\n")
+        recent = {remove_timestamps(line).strip() for line in merged_lines[-lookback:]}
+        skip = 0
+        while skip < len(lines) and (
+            not lines[skip].strip() or remove_timestamps(lines[skip]).strip() in recent
+        ):
+            skip += 1
+        merged_lines.extend(lines[skip:])
+    return "\n".join(merged_lines)
+
+
 # --- Transcription Alignment -----------------------------------------------
+def timestamps_overlap(teacher_text: str, observer_content: str) -> bool:
+    """
+    Check whether two transcriptions have interleavable [MM:SS] timestamps
+    
+    Alignment only has work to do when both texts carry timestamps and
+    their time ranges overlap; otherwise stripping timestamps gives the
+    same result without an API call.
+    """
+    teacher_times = [int(m) * 60 + int(s) for m, s in TIMESTAMP_PATTERN.findall(teacher_text or "")]
+    observer_times = [int(m) * 60 + int(s) for m, s in TIMESTAMP_PATTERN.findall(observer_content or "")]
+    if not teacher_times or not observer_times:
+        return False
+    return min(teacher_times) <= max(observer_times) and min(observer_times) <= max(teacher_times)
+
+
 def align_transcriptions(teacher_text: str, observer_content: str, client, config) -> tuple[str, str]:
     """
     Align teacher and observer transcriptions chronologically
@@ -73,19 +337,17 @@ def align_transcriptions(teacher_text: str, observer_content: str, client, confi
         if not observer_content:
             return remove_timestamps(teacher_text), ""
         
+        # Nothing to interleave: skip the API call
+        if not timestamps_overlap(teacher_text, observer_content):
+            return remove_timestamps(teacher_text), remove_timestamps(observer_content)
+        
         # Generate alignment prompt
         alignment_prompt = prompts.get_alignment_prompt(teacher_text, observer_content)
         
         # Attempt alignment via API
         result_text = ""
         try:
-            response = client.models.generate_content(
-                model="gemini-flash-latest",
-                contents=[types.Content(parts=[types.Part(text=alignment_prompt)])],
-                config=config,
-            )
-            if hasattr(response, 'text') and response.text:
-                result_text = response.text
+            result_text = cached_generate(client, alignment_prompt, config, persist=True) or ""
         except:
             result_text = ""
         
@@ -1,5 +1,23 @@
 # --- Utility Functions: Text Validation & Sanitization --------------------
 import re
+from functools import lru_cache
+
+# [MM:SS] transcript markers; minutes run past 99 on long recordings
+TIMESTAMP_PATTERN = re.compile(r'\[(\d{2,}):(\d{2})\]')
+_TIMESTAMP_RE = re.compile(TIMESTAMP_PATTERN.pattern + r'\s*')
+
+# Runs of 60 non-space characters followed by more, for soft break insertion
+_LONG_TOKEN_RE = re.compile(r"(\S{60})(?=\S)")
+
+# AI preambles stripped from transcriptions, applied in order
+_PREAMBLE_RES = (
+    re.compile(r'Thank you for providing.*?file:', re.IGNORECASE | re.DOTALL),
+    re.compile(r'I will transcribe.*?file:', re.IGNORECASE | re.DOTALL),
+    re.compile(r'Here is the transcription.*?:', re.IGNORECASE | re.DOTALL),
+)
+
+# Lines that open a new transcript segment (speaker turns and music cues)
+_SEGMENT_STARTS = ('Teacher:', 'Student:', 'Observer:', '<Music>')
 
 # --- Text Validation -------------------------------------------------------
 def validate_text_content(text: str, field_name: str = "content") -> tuple[bool, str]:
@@ -46,7 +64,8 @@ def validate_pdf_inputs(report_text: str, teacher_name: str, observer_name: str,
     
     # Test encoding cycle
     try:
-        sanitized = sanitize_text_for_pdf(report_text[:1000])  # Test first 1000 chars
+        # Test first 1000 chars; uncached so this probe does not evict real entries
+        sanitized = sanitize_text_for_pdf.__wrapped__(report_text[:1000])
         if not sanitized:
             return False, "Text sanitization produced empty result"
     except Exception as e:
@@ -56,79 +75,99 @@ def validate_pdf_inputs(report_text: str, teacher_name: str, observer_name: str,
 
 
 # --- Text Sanitization -----------------------------------------------------
+# Comprehensive Unicode to ASCII/Latin-1 replacement map
+_PDF_REPLACEMENTS = {
+    # Dashes
+    "\u2014": "-",   # em dash —
+    "\u2013": "-",   # en dash –
+    "\u2012": "-",   # figure dash ‒
+    "\u2011": "-",   # non-breaking hyphen ‑
+    
+    # Quotes
+    "\u2018": "'",   # left single quote '
+    "\u2019": "'",   # right single quote '
+    "\u201A": "'",   # single low-9 quote ‚
+    "\u201B": "'",   # single high-reversed-9 quote ‛
+    "\u201C": '"',   # left double quote "
+    "\u201D": '"',   # right double quote "
+    "\u201E": '"',   # double low-9 quote „
+    "\u201F": '"',   # double high-reversed-9 quote ‟
+    "\u2039": "'",   # single left-pointing angle quote ‹
+    "\u203A": "'",   # single right-pointing angle quote ›
+    
+    # Special punctuation
+    "\u2026": "...", # ellipsis …
+    "\u2022": "-",   # bullet •
+    "\u2023": "-",   # triangular bullet ‣
+    "\u2043": "-",   # hyphen bullet ⁃
+    "\u00B7": "-",   # middle dot ·
+    "\u00A0": " ",   # non-breaking space
+    "\u202F": " ",   # narrow no-break space
+    "\u2002": " ",   # en space
+    "\u2003": " ",   # em space
+    "\u2009": " ",   # thin space
+    
+    # Mathematical and special symbols
+    "\u00D7": "x",   # multiplication sign ×
+    "\u00F7": "/",   # division sign ÷
+    "\u2212": "-",   # minus sign −
+    "\u2260": "!=",  # not equal to ≠
+    "\u2264": "<=",  # less than or equal to ≤
+    "\u2265": ">=",  # greater than or equal to ≥
+    
+    # Currency (keep common ones)
+    "\u20AC": "EUR", # euro sign €
+    "\u00A3": "GBP", # pound sign £
+    "\u00A5": "YEN", # yen sign ¥
+}
+
+
+class _SafeStr(str):
+    """String already passed through sanitize_text_for_pdf"""
+    __slots__ = ()
+
+
+# The solo session PDF is rebuilt on every rerun with the same transcription;
+# a few recent results are kept so it is only scanned once
+@lru_cache(maxsize=8)
 def sanitize_text_for_pdf(text: str) -> str:
     """
     Replace/strip characters not supported by core PDF fonts (Latin-1)
     and add soft break opportunities to very long tokens so MultiCell can wrap.
+    Results are tagged so sanitizing the same text again returns it as-is.
     """
     if not text:
         return ""
+    if isinstance(text, _SafeStr):
+        return text
+
+    # Pure ASCII text (the common case) has nothing to replace or drop
+    is_ascii = text.isascii()
 
-    # Comprehensive Unicode to ASCII/Latin-1 replacement map
-    replacements = {
-        # Dashes
-        "\u2014": "-",   # em dash —
-        "\u2013": "-",   # en dash –
-        "\u2012": "-",   # figure dash ‒
-        "\u2011": "-",   # non-breaking hyphen ‑
-        
-        # Quotes
-        "\u2018": "'",   # left single quote '
-        "\u2019": "'",   # right single quote '
-        "\u201A": "'",   # single low-9 quote ‚
-        "\u201B": "'",   # single high-reversed-9 quote ‛
-        "\u201C": '"',   # left double quote "
-        "\u201D": '"',   # right double quote "
-        "\u201E": '"',   # double low-9 quote „
-        "\u201F": '"',   # double high-reversed-9 quote ‟
-        "\u2039": "'",   # single left-pointing angle quote ‹
-        "\u203A": "'",   # single right-pointing angle quote ›
-        
-        # Special punctuation
-        "\u2026": "...", # ellipsis …
-        "\u2022": "-",   # bullet •
-        "\u2023": "-",   # triangular bullet ‣
-        "\u2043": "-",   # hyphen bullet ⁃
-        "\u00B7": "-",   # middle dot ·
-        "\u00A0": " ",   # non-breaking space
-        "\u202F": " ",   # narrow no-break space
-        "\u2002": " ",   # en space
-        "\u2003": " ",   # em space
-        "\u2009": " ",   # thin space
-        
-        # Mathematical and special symbols
-        "\u00D7": "x",   # multiplication sign ×
-        "\u00F7": "/",   # division sign ÷
-        "\u2212": "-",   # minus sign −
-        "\u2260": "!=",  # not equal to ≠
-        "\u2264": "<=",  # less than or equal to ≤
-        "\u2265": ">=",  # greater than or equal to ≥
-        
-        # Currency (keep common ones)
-        "\u20AC": "EUR", # euro sign €
-        "\u00A3": "GBP", # pound sign £
-        "\u00A5": "YEN", # yen sign ¥
-    }
-    
     # Apply replacements
-    for src, dst in replacements.items():
-        text = text.replace(src, dst)
+    if not is_ascii:
+        for src, dst in _PDF_REPLACEMENTS.items():
+            text = text.replace(src, dst)
 
     # Insert break opportunities for very long unbroken tokens (e.g., URLs)
-    # This ensures MultiCell has a place to wrap lines.
-    text = re.sub(r"(\S{60})(?=\S)", r"\1 ", text)
+    # This ensures MultiCell has a place to wrap lines. Splitting on
+    # whitespace to find the longest token is about twice as fast as the
+    # regex scan, so the scan only runs when some token needs it.
+    if max(map(len, text.split()), default=0) > 60:
+        text = _LONG_TOKEN_RE.sub(r"\1 ", text)
 
     # Latin-1 encode/decode to drop remaining unsupported chars safely.
-    try:
-        text = text.encode("latin-1", "ignore").decode("latin-1")
-    except Exception as e:
-        # If encoding fails completely, try aggressive cleaning
-        text = ''.join(char for char in text if ord(char) < 256)
+    if not is_ascii:
+        try:
+            text = text.encode("latin-1", "ignore").decode("latin-1")
+        except Exception as e:
+            # If encoding fails completely, try aggressive cleaning
+            text = ''.join(char for char in text if ord(char) < 256)
 
     # Normalize line endings
     text = text.replace("\r\n", "\n").replace("\r", "\n")
     
-    return text
+    return _SafeStr(text)
 
 
 # --- Transcription Cleaning ------------------------------------------------
@@ -137,9 +176,8 @@ def clean_transcription(text: str) -> str:
     if not text:
         return ""
     
-    text = re.sub(r'Thank you for providing.*?file:', '', text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r'I will transcribe.*?file:', '', text, flags=re.IGNORECASE | re.DOTALL)
-    text = re.sub(r'Here is the transcription.*?:', '', text, flags=re.IGNORECASE | re.DOTALL)
+    for preamble_re in _PREAMBLE_RES:
+        text = preamble_re.sub('', text)
     return text.strip()
 
 
@@ -147,7 +185,7 @@ def remove_timestamps(text: str) -> str:
     """Remove timestamp markers from transcription"""
     if not text:
         return ""
-    return re.sub(r'\[\d{2}:\d{2}\]\s*', '', text)
+    return _TIMESTAMP_RE.sub('', text)
 
 
 # --- Segment Parsing for PDF -----------------------------------------------
@@ -158,20 +196,21 @@ def parse_segments(text: str) -> list:
     
     segments = []
     current_segment = []
+    append_segment = segments.append
     
     for line in text.split('\n'):
         line = line.strip()
         if not line:
             continue
         
-        if line.startswith(('Teacher:', 'Student:', 'Observer:', '<Music>')):
+        if line.startswith(_SEGMENT_STARTS):
             if current_segment:
-                segments.append(' '.join(current_segment))
+                append_segment(' '.join(current_segment))
             current_segment = [line]
         else:
             current_segment.append(line)
     
     if current_segment:
-        segments.append(' '.join(current_segment))
+        append_segment(' '.join(current_segment))
     
     return segments if segments else ["No content available."]
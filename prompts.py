@@ -1,4 +1,5 @@
 # --- All Prompt Templates --------------------------------------------------
+import string
 
 # --- Transcription Prompts -------------------------------------------------
 TEACHER_TRANSCRIPTION_PROMPT = """CRITICAL INSTRUCTIONS:
@@ -58,31 +59,55 @@ OBSERVER CONTENT WITH TIMESTAMPS:
 
 Remember: Output must start with "ALIGNED_TEACHER:" and include "ALIGNED_OBSERVER:" section. No other text."""
 
+# --- Shared Transcript Context ---------------------------------------------
+def get_transcript_context(aligned_teacher: str, aligned_observer: str) -> str:
+    """
+    Build the transcript block sent as the first part of the analysis and report calls.
+    Putting it ahead of the task instructions lets Gemini's implicit context caching
+    reuse it across calls that send the same text, such as a regenerated report.
+    Analysis gets the pre-alignment text, so it shares this prefix with the report
+    only when alignment was skipped or fell back to the timestamp-free text.
+    """
+    return f"""TEACHER AUDIO TRANSCRIPTION:
+{aligned_teacher if aligned_teacher else "Not available - no teacher audio provided."}
+
+OBSERVER OBSERVATIONS:
+{aligned_observer if aligned_observer else "No observer notes provided."}"""
+
+# --- Lesson Analysis + Research Prompt -------------------------------------
+def get_analysis_and_research_prompt() -> str:
+    """Generate a single prompt that returns both the lesson analysis and the best practices research"""
+    return """Complete BOTH tasks below for the music lesson transcription above.
+
+TASK 1 - LESSON ANALYSIS:
+Identify:
+1. Lesson type (e.g., general music, instrumental, vocal, theory)
+2. Approximate grade level
+3. Main teaching focus and objectives
+4. Key pedagogical approaches observed
+Provide a concise analysis in 2-3 sentences.
+
+TASK 2 - BEST PRACTICES RESEARCH:
+Based on your lesson analysis, research and summarize current best practices in music education for this context.
+Focus on:
+1. Pedagogical strategies for this lesson type and grade level
+2. Current research on effective teaching methods
+3. Recommended approaches from music education literature
+Provide a concise summary with specific, actionable insights.
+
+Output ONLY in this exact format, with no introductory text:
+
+LESSON_ANALYSIS:
+[Your lesson analysis]
+
+BEST_PRACTICES:
+[Your best practices summary]"""
+
 # --- Report Generation Prompt ----------------------------------------------
-def get_report_generation_prompt(
-    lesson_analysis: str,
-    best_practices: str,
-    aligned_teacher: str,
-    aligned_observer: str,
-    evaluation_criteria: str,
-    report_sections: list,
-    report_length: str
-) -> str:
-    """Generate comprehensive observation report prompt"""
-    
-    criteria_text = ""
-    if evaluation_criteria:
-        criteria_text = f"\n\nEVALUATION CRITERIA PROVIDED:\n{evaluation_criteria}"
-    
-    sections_text = ", ".join(report_sections) if report_sections else "Summary, Strengths, Areas for Growth"
-    
-    length_instruction = {
-        "Brief": "Keep the report concise (1-2 paragraphs per section).",
-        "Standard": "Provide a thorough analysis with appropriate detail (2-3 paragraphs per section).",
-        "Comprehensive": "Provide an extensive, detailed analysis with multiple examples (3-4+ paragraphs per section).",
-    }
-    
-    return f"""GENERATE MUSIC TEACHER OBSERVATION REPORT
+# Static head of every report prompt. It is built once and is byte-identical
+# across runs, so a report regenerated for the same lesson matches Gemini's
+# implicit prefix cache through the transcripts and these instructions
+REPORT_FORMAT_INSTRUCTIONS = """GENERATE MUSIC TEACHER OBSERVATION REPORT
 
 CRITICAL FORMATTING INSTRUCTIONS - READ CAREFULLY:
 1. DO NOT USE MARKDOWN. Do not use asterisks (**) for bold or italics.
@@ -112,52 +137,101 @@ Differentiation Strategies
 [Paragraph with constructive feedback]
 
 Time Management
-[Paragraph with constructive feedback]
+[Paragraph with constructive feedback]"""
+
+DEFAULT_REPORT_SECTIONS = "Summary, Strengths, Areas for Growth"
+
+REPORT_LENGTH_INSTRUCTIONS = {
+    "Brief": "Keep the report concise (1-2 paragraphs per section).",
+    "Standard": "Provide a thorough analysis with appropriate detail (2-3 paragraphs per section).",
+    "Comprehensive": "Provide an extensive, detailed analysis with multiple examples (3-4+ paragraphs per section).",
+}
+
+# Compiled once; only the per-run fields are substituted
+_REPORT_TEMPLATE = string.Template(REPORT_FORMAT_INSTRUCTIONS + """
 
-SCOPE INSTRUCTION:
-{_get_scope_instruction(aligned_teacher, aligned_observer)}
-{criteria_text}
+${scope_instruction}
+${criteria_text}
 
 SECTION REQUIREMENTS:
-Include these sections: {sections_text}
-{length_instruction[report_length]}
+Include these sections: ${sections_text}
+${length_instruction}
 
-AVAILABLE DATA:
-- Teacher Audio: {'YES' if aligned_teacher else 'NO'}
-- Observer Audio/Notes: {'YES' if aligned_observer else 'NO'}
+AVAILABLE DATA: ${available_data}
 
 LESSON ANALYSIS:
-{lesson_analysis}
+${lesson_analysis}
 
 BEST PRACTICES RESEARCH:
-{best_practices}
+${best_practices}
 
-TEACHER AUDIO TRANSCRIPTION:
-{aligned_teacher if aligned_teacher else "Not available - no teacher audio provided."}
-
-OBSERVER OBSERVATIONS:
-{aligned_observer if aligned_observer else "No observer notes provided."}
+Base the report on the TEACHER AUDIO TRANSCRIPTION and OBSERVER OBSERVATIONS provided above.
 
-REMEMBER: Output plain text only. No markdown. No asterisks. No brackets. The formatting will be applied during PDF generation. Do NOT include any 'Note:' or 'Disclaimer:' text."""
+REMEMBER: Output plain text only. No markdown. No asterisks. No brackets. The formatting will be applied during PDF generation. Do NOT include any 'Note:' or 'Disclaimer:' text.""")
 
-def _get_scope_instruction(aligned_teacher: str, aligned_observer: str) -> str:
-    """Helper function to determine scope instruction based on available inputs"""
-    if aligned_teacher and aligned_observer:
-        return """
+def get_report_generation_prompt(
+    lesson_analysis: str,
+    best_practices: str,
+    aligned_teacher: str,
+    aligned_observer: str,
+    evaluation_criteria: str,
+    report_sections: list,
+    report_length: str,
+    input_summary: str = ""
+) -> str:
+    """
+    Generate comprehensive observation report prompt
+    The transcripts themselves are sent separately as a leading part (see get_transcript_context)
+    """
+    
+    criteria_text = ""
+    if evaluation_criteria:
+        criteria_text = f"\n\nEVALUATION CRITERIA PROVIDED:\n{evaluation_criteria}"
+    
+    sections_text = ", ".join(report_sections) if report_sections else DEFAULT_REPORT_SECTIONS
+    
+    return _REPORT_TEMPLATE.substitute(
+        scope_instruction=_get_scope_instruction(aligned_teacher, aligned_observer),
+        criteria_text=criteria_text,
+        sections_text=sections_text,
+        length_instruction=REPORT_LENGTH_INSTRUCTIONS[report_length],
+        available_data=input_summary or _describe_sources(aligned_teacher, aligned_observer),
+        lesson_analysis=lesson_analysis,
+        best_practices=best_practices,
+    )
+
+# Scope paragraph per available-source combination
+_SCOPE_INSTRUCTIONS = {
+    "both": """
 SCOPE: Full classroom analysis with both teacher audio and observer notes available.
-- Use teacher audio quotes as evidence
 - Prioritize observer observations and find supporting evidence in teacher audio
-- Provide comprehensive feedback"""
-    elif aligned_teacher:
-        return """
+- Provide comprehensive feedback""",
+    "teacher": """
 SCOPE: Analysis based on teacher classroom audio only (no observer notes).
-- Use teacher audio quotes as evidence
 - Base evaluation on best practices research
-- Provide objective analysis of observed teaching practices"""
-    else:
-        return """
+- Provide objective analysis of observed teaching practices""",
+    "observer": """
 SCOPE: Analysis based ONLY on observer notes/audio (no teacher classroom audio).
 - Focus on documented observer observations
 - Acknowledge limited scope - no direct classroom audio evidence available
 - Include disclaimer noting report is based on observer perspective only
-- Do NOT quote observer audio - paraphrase their observations instead"""
+- Do NOT quote observer audio - paraphrase their observations instead""",
+}
+
+def _describe_sources(aligned_teacher: str, aligned_observer: str) -> str:
+    """Short source list for callers that do not pass an input summary"""
+    sources = []
+    if aligned_teacher:
+        sources.append("teacher classroom audio")
+    if aligned_observer:
+        sources.append("observer audio/notes")
+    return ", ".join(sources) or "none"
+
+def _get_scope_instruction(aligned_teacher: str, aligned_observer: str) -> str:
+    """Helper function to determine scope instruction based on available inputs"""
+    if aligned_teacher and aligned_observer:
+        return _SCOPE_INSTRUCTIONS["both"]
+    elif aligned_teacher:
+        return _SCOPE_INSTRUCTIONS["teacher"]
+    else:
+        return _SCOPE_INSTRUCTIONS["observer"]
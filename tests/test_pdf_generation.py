@@ -0,0 +1,39 @@
+import random
+import re
+import unittest
+
+from core.pdf_generation import _strip_emphasis
+
+
+def _baseline_strip_emphasis(text: str) -> str:
+    """The original two-pass markdown removal from create_observation_report_pdf"""
+    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
+    return re.sub(r'\*(.+?)\*', r'\1', text)
+
+
+class StripEmphasisTest(unittest.TestCase):
+    def test_lone_asterisk_before_bold(self):
+        text = "5 * 3 **bold**"
+        self.assertEqual(_strip_emphasis(text), "5 * 3 bold")
+        self.assertEqual(_strip_emphasis(text), _baseline_strip_emphasis(text))
+
+    def test_matches_baseline_on_lone_asterisks(self):
+        samples = [
+            "a * b",
+            "**a** * b",
+            "*a* 2 * 3 ***c***",
+            "x ** y * z",
+            "* bullet with **bold** and *italic*",
+            "***",
+            "****",
+        ]
+        rng = random.Random(0)
+        alphabet = ["*", "**", "***", "a", "b", " ", "\n", "5", "-"]
+        for _ in range(2000):
+            samples.append("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 20))))
+        for text in samples:
+            self.assertEqual(_strip_emphasis(text), _baseline_strip_emphasis(text), repr(text))
+
+
+if __name__ == "__main__":
+    unittest.main()
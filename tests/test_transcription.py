@@ -0,0 +1,40 @@
+import io
+import unittest
+import wave
+
+import numpy as np
+
+from core.audio import strip_silence
+from core.transcription import _restore_timestamps, timestamps_overlap
+from core.utils import remove_timestamps
+
+_RATE = 1000
+
+
+def _wav(samples) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(_RATE)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+class RestoreTimestampsTest(unittest.TestCase):
+    def test_restored_time_past_100_minutes(self):
+        rng = np.random.default_rng(0)
+        speech = lambda seconds: rng.standard_normal(_RATE * seconds) * 3000
+        audio = _wav(np.concatenate([speech(5), np.zeros(_RATE * 6060), speech(5)]))
+
+        _, time_map = strip_silence(audio, "wav")
+        self.assertEqual(len(time_map), 2)
+
+        restored = _restore_timestamps("[00:01] Teacher: Hello.\n[00:07] Teacher: Welcome back.", time_map)
+        self.assertEqual(restored, "[00:01] Teacher: Hello.\n[101:06] Teacher: Welcome back.")
+        self.assertEqual(remove_timestamps(restored), "Teacher: Hello.\nTeacher: Welcome back.")
+        self.assertTrue(timestamps_overlap(restored, "[100:30] Observer: Still singing."))
+
+
+if __name__ == "__main__":
+    unittest.main()
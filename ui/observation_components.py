@@ -1,6 +1,8 @@
 # --- Observation Assistant Interface Components ---------------------------
 import streamlit as st
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
 import re
 
 def render_header():
@@ -121,89 +123,155 @@ def render_text_inputs():
     return observer_notes, evaluation_criteria
 
 
+# --- Cached PDF Builders ---------------------------------------------------
+# PDF layout is pure CPU work; builds run here so the preview renders meanwhile.
+# Pool threads have no ScriptRunContext, so they only run the plain builders;
+# the finished bytes are cached from the script thread in _pdf_cache()
+_PDF_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-build")
+
+
+# Every widget interaction reruns the script; this keeps the PDFs from being
+# rebuilt unless the report, names, or transcripts actually changed
+@st.cache_resource
+def _pdf_cache():
+    """Shared LRU of built PDF bytes, keyed by builder and arguments"""
+    from core.llm_cache import LLMCache
+    return LLMCache(maxsize=16, ttl=86400)
+
+
+def _clean_report_text(report_text: str) -> str:
+    """Strip AI-generated header lines that duplicate what the PDF adds"""
+    # Remove any AI-generated headers that duplicate what we add in PDF
+    cleaned_report = re.sub(
+        r'^\*{0,2}Music Teacher Observation Report\*{0,2}\s*\n',
+        '',
+        report_text,
+        flags=re.IGNORECASE | re.MULTILINE
+    )
+    
+    # Remove date lines that match our format
+    cleaned_report = re.sub(
+        r'^[A-Z][a-z]+ \d{1,2},? \d{4}\s*\n',
+        '',
+        cleaned_report,
+        flags=re.MULTILINE
+    )
+    
+    # Remove Teacher: and Observer: lines if at the start
+    cleaned_report = re.sub(
+        r'^Teacher:\s*.+?\n',
+        '',
+        cleaned_report,
+        flags=re.IGNORECASE | re.MULTILINE,
+        count=1
+    )
+    cleaned_report = re.sub(
+        r'^Observer:\s*.+?\n',
+        '',
+        cleaned_report,
+        flags=re.IGNORECASE | re.MULTILINE,
+        count=1
+    )
+    
+    # Remove any leading whitespace
+    return cleaned_report.lstrip()
+
+
+def _build_report_pdf(report_text: str, teacher_name: str, observer_name: str, date_str: str, has_teacher_audio: bool) -> bytes:
+    """Build the observation report PDF"""
+    from core.pdf_generation import create_observation_report_pdf
+    return create_observation_report_pdf(
+        report_text=report_text,
+        teacher_name=teacher_name,
+        observer_name=observer_name,
+        date_str=date_str,
+        report_length="standard",  # Hardcoded default
+        has_teacher_audio=has_teacher_audio,
+    )
+
+
+def _build_transcript_pdf(teacher_text: str, observer_text: str) -> bytes:
+    """Build the dual-column transcript PDF"""
+    from core.pdf_generation import create_dual_column_pdf
+    return create_dual_column_pdf(teacher_text, observer_text)
+
+
+def _submit_pdf_build(build, *args) -> tuple:
+    """
+    Start build(*args) on the PDF pool unless its bytes are already cached
+
+    Returns:
+        Tuple of (cache_key, future). On a cache hit the future is already
+        resolved; pass both to _pdf_result once the bytes are needed.
+    """
+    key = hashlib.sha256(repr((build.__name__, args)).encode("utf-8")).hexdigest()
+    cached = _pdf_cache().get(key)
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return key, future
+    return key, _PDF_POOL.submit(build, *args)
+
+
+def _pdf_result(key: str, future: Future) -> bytes:
+    """Wait for a PDF build and cache its bytes; build errors propagate"""
+    pdf_bytes = future.result()
+    _pdf_cache().set(key, pdf_bytes)
+    return pdf_bytes
+
+
+@st.fragment
 def render_downloads():
     """
     Render download section with PDF/text downloads
     Uses hardcoded settings: report_length="Standard", include_transcript=True
+    Runs as a fragment so clicking a download button reruns only this section;
+    everything it needs is read from session state.
     """
-    from core.pdf_generation import (
-        create_observation_report_pdf, 
-        create_dual_column_pdf,
-    )
     from core.text_exports import (
         create_text_fallback,
         create_transcript_text_fallback
     )
-    
-    st.markdown("---")
-    st.markdown("## 📥 Download Reports")
-
-    # Report preview
-    with st.expander("📄 Preview Observation Report", expanded=False):
-        st.markdown(st.session_state.observation_report)
 
     # Generate timestamp
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     date_formatted = datetime.now().strftime('%B %d, %Y')
 
-    col_dl1, col_dl2 = st.columns(2)
-
     # Get name inputs from session state or use defaults
     teacher_name = getattr(st.session_state, 'teacher_name', 'Not specified')
     observer_name = getattr(st.session_state, 'observer_name', 'Not specified')
+    teacher_text = st.session_state.aligned_teacher if st.session_state.aligned_teacher else ""
+    observer_text = st.session_state.aligned_observer if st.session_state.aligned_observer else ""
+    has_transcript = bool(teacher_text or observer_text)
+
+    # Start both PDF builds before rendering the preview so layout runs
+    # alongside the page render instead of after it
+    report_pdf_key, report_pdf_future = _submit_pdf_build(
+        _build_report_pdf,
+        _clean_report_text(st.session_state.observation_report),
+        teacher_name if teacher_name else "Not specified",
+        observer_name if observer_name else "Not specified",
+        date_formatted,
+        bool(hasattr(st.session_state, 'teacher_transcription') and st.session_state.teacher_transcription),
+    )
+    transcript_pdf_key, transcript_pdf_future = (
+        _submit_pdf_build(_build_transcript_pdf, teacher_text, observer_text)
+        if has_transcript else (None, None)
+    )
+
+    st.markdown("---")
+    st.markdown("## 📥 Download Reports")
+
+    # Report preview
+    with st.expander("📄 Preview Observation Report", expanded=False):
+        st.markdown(st.session_state.observation_report)
+
+    col_dl1, col_dl2 = st.columns(2)
 
     with col_dl1:
         # Primary download: Observation Report
         try:
-            # Clean any duplicate header text from AI output
-            cleaned_report = st.session_state.observation_report
-            
-            # Remove any AI-generated headers that duplicate what we add in PDF
-            cleaned_report = re.sub(
-                r'^\*{0,2}Music Teacher Observation Report\*{0,2}\s*\n',
-                '',
-                cleaned_report,
-                flags=re.IGNORECASE | re.MULTILINE
-            )
-            
-            # Remove date lines that match our format
-            cleaned_report = re.sub(
-                r'^[A-Z][a-z]+ \d{1,2},? \d{4}\s*\n',
-                '',
-                cleaned_report,
-                flags=re.MULTILINE
-            )
-            
-            # Remove Teacher: and Observer: lines if at the start
-            cleaned_report = re.sub(
-                r'^Teacher:\s*.+?\n',
-                '',
-                cleaned_report,
-                flags=re.IGNORECASE | re.MULTILINE,
-                count=1
-            )
-            cleaned_report = re.sub(
-                r'^Observer:\s*.+?\n',
-                '',
-                cleaned_report,
-                flags=re.IGNORECASE | re.MULTILINE,
-                count=1
-            )
-            
-            # Remove any leading whitespace
-            cleaned_report = cleaned_report.lstrip()
-            
-            # Determine if we have teacher audio
-            has_teacher_audio = hasattr(st.session_state, 'teacher_transcription') and st.session_state.teacher_transcription
-            
-            report_pdf_bytes = create_observation_report_pdf(
-                report_text=cleaned_report,
-                teacher_name=teacher_name if teacher_name else "Not specified",
-                observer_name=observer_name if observer_name else "Not specified",
-                date_str=date_formatted,
-                report_length="standard",  # Hardcoded default
-                has_teacher_audio=has_teacher_audio,
-            )
+            report_pdf_bytes = _pdf_result(report_pdf_key, report_pdf_future)
             st.download_button(
                 label="⬇️ Download Observation Report (PDF)",
                 data=report_pdf_bytes,
@@ -231,21 +299,10 @@ def render_downloads():
 
     with col_dl2:
         # Secondary download: Full Transcript (always included)
-        if st.session_state.aligned_teacher or st.session_state.aligned_observer:
+        if transcript_pdf_future is not None:
             try:
-                # Determine which PDF format to use
-                if st.session_state.aligned_teacher and st.session_state.aligned_observer:
-                    # Both sources: dual column
-                    transcript_pdf_bytes = create_dual_column_pdf(
-                        st.session_state.aligned_teacher,
-                        st.session_state.aligned_observer
-                    )
-                else:
-                    # Single source: use dual column with empty for missing side
-                    transcript_pdf_bytes = create_dual_column_pdf(
-                        st.session_state.aligned_teacher if st.session_state.aligned_teacher else "",
-                        st.session_state.aligned_observer if st.session_state.aligned_observer else ""
-                    )
+                # Dual column; a missing source is passed as an empty side
+                transcript_pdf_bytes = _pdf_result(transcript_pdf_key, transcript_pdf_future)
                 
                 st.download_button(
                     label="⬇️ Download Full Transcript (PDF)",
@@ -260,8 +317,8 @@ def render_downloads():
                 
                 # Text fallback for transcript
                 transcript_text = create_transcript_text_fallback(
-                    st.session_state.aligned_teacher if st.session_state.aligned_teacher else "",
-                    st.session_state.aligned_observer if st.session_state.aligned_observer else "",
+                    teacher_text,
+                    observer_text,
                     date_formatted
                 )
                 st.download_button(